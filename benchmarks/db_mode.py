@@ -0,0 +1,86 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT_DIR, "src"))
+
+from context import AppContext
+from fetch import parse_content_to_uris, save_uris_to_db
+from transform import transform_uris
+from benchmarks.generator import generate_sources
+
+
+def make_sources(size, sources, seed):
+    ctx = AppContext()
+    batches = []
+    for body in generate_sources(size, sources=sources, seed=seed).values():
+        uris = set()
+        lines = ctx.decoders_map["decode_content"](body, ctx)
+        for proto_uris in parse_content_to_uris(lines, ctx)[0].values():
+            uris.update(proto_uris)
+        batches.append(uris)
+    return batches
+
+
+def run_pipeline(db_mode, batches):
+    ctx = AppContext(db_mode=db_mode)
+    db_path = ctx.configs_map["DB_PATH"]
+    write_behind = ctx.configs_map["WRITE_BEHIND"]
+    timings = {}
+    try:
+        started = time.perf_counter()
+        ctx.ensure_table("uris_raw")
+        ctx.ensure_table("uris_rejected")
+        writer = ctx.database_map["write_behind_writer"](
+            db_path,
+            max_pending=write_behind["max_pending_batches"],
+            group_size=write_behind["group_batches"],
+        )
+        with writer:
+            for batch in batches:
+                save_uris_to_db(batch, writer, ctx)
+        timings["fetch_write"] = time.perf_counter() - started
+        started = time.perf_counter()
+        transform_uris(ctx)
+        timings["transform"] = time.perf_counter() - started
+        started = time.perf_counter()
+        ctx.database_map["optimize_database"](db_path=db_path)
+        ctx.persist()
+        timings["finalize"] = time.perf_counter() - started
+    finally:
+        ctx.close()
+    timings["total"] = sum(timings.values())
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.db_mode")
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--sources", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    batches = make_sources(args.size, args.sources, args.seed)
+    results = {}
+    for db_mode in ["disk", "memory"]:
+        with tempfile.TemporaryDirectory() as workdir:
+            cwd = os.getcwd()
+            os.chdir(workdir)
+            try:
+                os.makedirs("data")
+                os.makedirs("output")
+                results[db_mode] = run_pipeline(db_mode, batches)
+            finally:
+                os.chdir(cwd)
+    print(f"{'stage':<12} {'disk':>10} {'memory':>10}")
+    for stage in results["disk"]:
+        print(
+            f"{stage:<12} {results['disk'][stage]:>9.3f}s "
+            f"{results['memory'][stage]:>9.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT_DIR, "src"))
+
+from context import AppContext
+from fetch import fetch_source, fetch_uris, parse_content_to_uris
+from transform import transform_uris, compute_hash
+from benchmarks.generator import generate_lines, generate_sources
+from benchmarks.stub_server import serve_bodies
+
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+BASELINE_PATH = os.path.join(ROOT_DIR, "benchmarks", "baseline.json")
+
+
+@contextlib.contextmanager
+def workspace():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        os.makedirs("data")
+        os.makedirs("output")
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                yield
+        finally:
+            os.chdir(cwd)
+
+
+def timed(func):
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def seed_raw_table(ctx, lines):
+    uris = set()
+    for proto_uris in parse_content_to_uris("\n".join(lines), ctx)[0].values():
+        uris.update(proto_uris)
+    decode = ctx.processors_map["decode_url_encode"]
+    ctx.ensure_table("uris_raw")
+    ctx.database_map["bulk_upsert"](
+        db_path=ctx.configs_map["DB_PATH"],
+        table_name="uris_raw",
+        records=({"uri": decode(uri)} for uri in sorted(uris)),
+        key_columns="uri",
+    )
+
+
+def bench_fetch_parse(size, seed):
+    bodies = generate_sources(size, seed=seed)
+    ctx = AppContext()
+    with serve_bodies(bodies) as urls, workspace():
+
+        def run():
+            for url in urls:
+                fetch_source(url, ctx)
+
+        return timed(run)
+
+
+def bench_transform(size, seed):
+    lines = generate_lines(size, seed=seed)
+    with workspace():
+        ctx = AppContext()
+        seed_raw_table(ctx, lines)
+        return timed(lambda: transform_uris(ctx))
+
+
+def bench_hashing(size, seed):
+    lines = generate_lines(size, seed=seed, duplicate_ratio=0, junk_ratio=0)
+    with workspace():
+        ctx = AppContext()
+        seed_raw_table(ctx, lines)
+        transform_uris(ctx)
+        with open(ctx.configs_map["URIS_TRANSFORM_PATH"], encoding="utf-8") as f:
+            objects = json.load(f)
+        for obj in objects:
+            obj.pop("hash", None)
+        return timed(lambda: [compute_hash(obj, ctx) for obj in objects])
+
+
+def bench_upsert(size, seed):
+    lines = generate_lines(size, seed=seed, duplicate_ratio=0, junk_ratio=0)
+    with workspace():
+        ctx = AppContext()
+        ctx.ensure_table("uris_raw")
+
+        def run():
+            ctx.database_map["bulk_upsert"](
+                db_path=ctx.configs_map["DB_PATH"],
+                table_name="uris_raw",
+                records=({"uri": line} for line in lines),
+                key_columns="uri",
+                touch_columns=["updated_at"],
+            )
+
+        run()
+        return timed(run)
+
+
+def bench_pipeline(size, seed):
+    bodies = generate_sources(size, seed=seed)
+    with serve_bodies(bodies) as urls, workspace():
+        ctx = AppContext()
+
+        def run():
+            fetch_uris(ctx, urls)
+            transform_uris(ctx)
+
+        return timed(run)
+
+
+SUITES = {
+    "fetch_parse": bench_fetch_parse,
+    "transform": bench_transform,
+    "hashing": bench_hashing,
+    "upsert": bench_upsert,
+    "pipeline": bench_pipeline,
+}
+
+
+def run_suites(suites, sizes, seed, repeat):
+    results = {}
+    for suite in suites:
+        for size in sizes:
+            best = min(SUITES[suite](size, seed) for _ in range(repeat))
+            key = f"{suite}/{size}"
+            results[key] = {"seconds": best, "per_second": size / best if best else 0}
+            print(f"{key:<22} {best:>9.3f}s {results[key]['per_second']:>12,.0f}/s")
+    return results
+
+
+def compare_baseline(results, baseline, threshold):
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if not previous:
+            continue
+        ratio = result["seconds"] / previous["seconds"] if previous["seconds"] else 1
+        if ratio > 1 + threshold:
+            regressions.append((key, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--suite", action="append", choices=list(SUITES))
+    parser.add_argument("--sizes", default="1000,10000")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = run_suites(args.suite or list(SUITES), sizes, args.seed, args.repeat)
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "seed": args.seed,
+        "results": results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    result_path = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%dT%H%M%S')}.json")
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved results to {result_path}")
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against, run with --save-baseline first.")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare_baseline(results, baseline, args.threshold)
+    for key, ratio in regressions:
+        print(f"REGRESSION {key}: {ratio:.2f}x slower than baseline")
+    if regressions:
+        sys.exit(1)
+    print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
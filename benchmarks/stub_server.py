@@ -0,0 +1,37 @@
+import contextlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(bodies):
+    encoded = {f"/{name}": body.encode("utf-8") for name, body in bodies.items()}
+
+    class SubscriptionHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            payload = encoded.get(self.path)
+            if payload is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return SubscriptionHandler
+
+
+@contextlib.contextmanager
+def serve_bodies(bodies):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(bodies))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        yield [f"http://{host}:{port}/{name}" for name in bodies]
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,62 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.validators import validators_map, validate_batch
+
+
+def make_values(name, count, seed):
+    rng = random.Random(seed)
+    values = []
+    for _ in range(count):
+        if name == "ipv4":
+            value = ".".join(str(rng.randrange(300)) for _ in range(4))
+        elif name == "ipv6":
+            groups = [f"{rng.getrandbits(16):x}" for _ in range(8)]
+            value = ":".join(groups) if rng.random() < 0.5 else "::".join(groups[:2])
+        elif name in ("domain", "host"):
+            value = f"node{rng.randrange(count // 8 + 1)}.cdn-{rng.randrange(50)}.example.com"
+        elif name == "port":
+            value = rng.randrange(70000)
+        else:
+            value = (
+                f"{rng.getrandbits(32):08x}-{rng.getrandbits(16):04x}-"
+                f"{rng.getrandbits(16):04x}-{rng.getrandbits(16):04x}-"
+                f"{rng.getrandbits(48):012x}"
+                if rng.random() < 0.9
+                else f"password-{rng.randrange(1000)}"
+            )
+        values.append(value)
+    return values
+
+
+def measure(func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.validators")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(f"{'validator':<10} {'scalar/s':>12} {'batch/s':>12}")
+    for name, validator in validators_map.items():
+        values = make_values(name, args.size, args.seed)
+        scalar = measure(lambda: [validator(v) for v in values], args.repeat)
+        batch = measure(lambda: validate_batch(name, values), args.repeat)
+        print(f"{name:<10} {args.size / scalar:>12,.0f} {args.size / batch:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,130 @@
+import os
+
 from utils.config import configs_map
-from utils.validators import validators_map
+from utils.validators import batch_map, validators_map
 from utils.processors import processors_map
 from utils.database import database_map
+from utils.resolvers import resolvers_map
+from utils.decoders import decoders_map
+from utils.metrics import Metrics
+from utils.bloom import BloomFilter
+from utils.geoip import load_geo_index, source_version
 
 
 class AppContext:
-    def __init__(self):
-        self.configs_map = configs_map
+    def __init__(self, db_mode="disk", profile_dir=None, shard=None):
+        self.configs_map = dict(configs_map)
         self.validators_map = validators_map
+        self.batch_map = batch_map
         self.processors_map = processors_map
         self.database_map = database_map
+        self.resolvers_map = dict(resolvers_map)
+        self.decoders_map = dict(decoders_map)
+        self.db_mode = db_mode
+        self.shard = shard
+        if shard is not None:
+            self.use_shard(*shard)
+        self.disk_db_path = self.configs_map["DB_PATH"]
+        self.memory_conn = None
+        self.ready_tables = set()
+        self.known_uris = None
+        self.geo_index = None
+        self.metrics = Metrics(
+            profile_dir=profile_dir,
+            sample_size=self.configs_map["TRANSFORM"]["rejection_samples"],
+        )
+        if db_mode == "memory":
+            memory_uri = f"file:xray-{os.getpid()}-{id(self)}?mode=memory&cache=shared"
+            self.memory_conn = self.database_map["load_into_memory"](
+                self.disk_db_path, memory_uri
+            )
+            self.configs_map["DB_PATH"] = memory_uri
+
+    def use_shard(self, index, count):
+        shard_dir = self.configs_map["SHARDS"]["dir"]
+        name = f"shard-{index}-of-{count}"
+        shard_of = self.processors_map["shard_of"]
+        os.makedirs(shard_dir, exist_ok=True)
+        self.configs_map["LINKS"] = [
+            url for url in self.configs_map["LINKS"] if shard_of(url, count) == index
+        ]
+        self.configs_map["DB_PATH"] = os.path.join(shard_dir, f"{name}.db")
+        self.configs_map["PREFILTER"] = {
+            **self.configs_map["PREFILTER"],
+            "path": os.path.join(shard_dir, f"{name}.bloom"),
+        }
+
+    def ensure_table(self, table_name):
+        if table_name in self.ready_tables:
+            self.metrics.incr("cache.schema_hits")
+            return
+        db_path = self.configs_map["DB_PATH"]
+        self.database_map["ensure_table"](
+            db_path=db_path,
+            table_name=table_name,
+            columns=self.configs_map["TABLE_SCHEMAS"][table_name],
+        )
+        self.database_map["ensure_indexes"](
+            db_path=db_path,
+            table_name=table_name,
+            indexes=self.configs_map["TABLE_INDEXES"].get(table_name, {}),
+        )
+        self.ready_tables.add(table_name)
+
+    def known_filter(self):
+        config = self.configs_map["PREFILTER"]
+        if not config["enabled"]:
+            return None
+        if self.known_uris is None:
+            self.known_uris = BloomFilter.load(
+                config["path"], config["capacity"], config["error_rate"]
+            )
+        if (
+            self.known_uris.age() > config["rotate_after"]
+            or self.known_uris.count >= config["capacity"]
+        ):
+            self.known_uris = BloomFilter(config["capacity"], config["error_rate"])
+            self.metrics.incr("prefilter.rotations")
+        if not self.known_uris.count:
+            self.seed_known_filter()
+        return self.known_uris
+
+    def seed_known_filter(self):
+        config = self.configs_map["PREFILTER"]
+        self.ensure_table("uris_raw")
+        rows = self.database_map["select_iter"](
+            db_path=self.configs_map["DB_PATH"],
+            table_name="uris_raw",
+            columns=["uri"],
+            where_clause="updated_at >= datetime('now', ?)",
+            params=(f"-{int(config['rotate_after'])} seconds",),
+            batch_size=10_000,
+        )
+        with self.metrics.span("prefilter.seed"):
+            self.known_uris.update(uri for (uri,) in rows)
+        self.metrics.incr("prefilter.seeded", self.known_uris.count)
+
+    def geoip(self):
+        config = self.configs_map["GEOIP"]
+        if not config["enabled"]:
+            return None
+        version = source_version(config["source_path"])
+        if self.geo_index is None or version not in (None, self.geo_index.version):
+            self.geo_index = load_geo_index(
+                config["source_path"], config["index_path"], config["cache_size"]
+            )
+        return self.geo_index
+
+    def save_known_filter(self):
+        if self.known_uris is not None:
+            self.known_uris.save(self.configs_map["PREFILTER"]["path"])
+
+    def persist(self):
+        if self.memory_conn is not None:
+            self.database_map["snapshot_to_disk"](self.memory_conn, self.disk_db_path)
+            self.save_known_filter()
+
+    def close(self):
+        if self.memory_conn is not None:
+            self.memory_conn.close()
+            self.memory_conn = None
@@ -0,0 +1,45 @@
+GEO_UPDATE_SQL = """
+    UPDATE uris_transformed SET country = ?, asn = ?, geo_version = ? WHERE rowid = ?
+""".strip()
+
+
+def enrich_uris(ctx):
+    config = ctx.configs_map["GEOIP"]
+    if not config["enabled"]:
+        return None
+    index = ctx.geoip()
+    if index is None:
+        print(f"GeoIP enrichment skipped: {config['source_path']} not found.")
+        return None
+    db_path = ctx.configs_map["DB_PATH"]
+    ctx.ensure_table("uris_transformed")
+    pages = ctx.database_map["select_pages"](
+        db_path=db_path,
+        table_name="uris_transformed",
+        columns=["COALESCE(resolved_ip, address)"],
+        where_clause="geo_version IS NULL OR geo_version != ?",
+        params=(index.version,),
+        page_size=config["batch_size"],
+    )
+    lookup = index.lookup
+    summary = {"tagged": 0, "matched": 0}
+    with ctx.metrics.span("enrich.geoip"):
+        for page in pages:
+            updates = []
+            for rowid, address in page:
+                country, asn = lookup(address) or (None, None)
+                if country or asn:
+                    summary["matched"] += 1
+                updates.append((country, asn, index.version, rowid))
+            with ctx.database_map["get_db_connection"](db_path) as conn:
+                conn.executemany(GEO_UPDATE_SQL, updates)
+            summary["tagged"] += len(updates)
+    ctx.metrics.incr("enrich.tagged", summary["tagged"])
+    ctx.metrics.incr("enrich.matched", summary["matched"])
+    stats = index.stats()
+    print(
+        f"GeoIP enrichment complete → {summary['tagged']} configs tagged, "
+        f"{summary['matched']} matched ({stats['v4_ranges']} IPv4 / "
+        f"{stats['v6_ranges']} IPv6 ranges)"
+    )
+    return summary
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+
+
+def export_xray(ctx, proxy_objects):
+    config = ctx.configs_map["XRAY_EXPORT"]
+    output_dir = config["output_dir"]
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    to_outbound = ctx.processors_map["proxy_to_outbound"]
+    skip = set(config["skip_protocols"])
+    outbounds = {}
+    for proxy_object in proxy_objects:
+        if proxy_object["protocol"]["type"] in skip:
+            continue
+        hash_val = proxy_object["hash"]
+        outbound = to_outbound(proxy_object, f"{config['tag_prefix']}{hash_val[:16]}")
+        if outbound is not None:
+            outbounds[hash_val] = outbound
+    manifest = read_manifest(manifest_path)
+    chunks = assign_chunks(manifest["chunks"], outbounds, config["chunk_size"])
+    os.makedirs(output_dir, exist_ok=True)
+    digests = {}
+    written = 0
+    for name, members in chunks.items():
+        digests[name] = members_digest(members)
+        path = os.path.join(output_dir, f"{name}.json")
+        if manifest["digests"].get(name) == digests[name] and os.path.exists(path):
+            continue
+        write_atomic(path, build_chunk_config(name, members, outbounds, config))
+        written += 1
+    removed = 0
+    for name in manifest["chunks"]:
+        if name not in chunks:
+            path = os.path.join(output_dir, f"{name}.json")
+            if os.path.exists(path):
+                os.remove(path)
+            removed += 1
+    write_atomic(manifest_path, {"chunks": chunks, "digests": digests})
+    ctx.metrics.incr("export.outbounds", len(outbounds))
+    ctx.metrics.incr("export.chunks_written", written)
+    print(
+        f"Xray export → {len(outbounds)} outbounds in {len(chunks)} chunks, "
+        f"{written} rewritten, {removed} removed ({output_dir})"
+    )
+    return None
+
+
+def read_manifest(path):
+    if not os.path.exists(path):
+        return {"chunks": {}, "digests": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def assign_chunks(previous, outbounds, chunk_size):
+    chunks = {}
+    placed = set()
+    for name, members in sorted(previous.items()):
+        kept = [h for h in members if h in outbounds][:chunk_size]
+        if kept:
+            chunks[name] = kept
+            placed.update(kept)
+    fresh = sorted(h for h in outbounds if h not in placed)
+    index = 0
+    for name in sorted(chunks):
+        room = chunk_size - len(chunks[name])
+        if room > 0 and index < len(fresh):
+            chunks[name].extend(fresh[index : index + room])
+            index += room
+    number = 0
+    while index < len(fresh):
+        name = f"chunk-{number:04d}"
+        number += 1
+        if name in chunks:
+            continue
+        chunks[name] = fresh[index : index + chunk_size]
+        index += chunk_size
+    return dict(sorted(chunks.items()))
+
+
+def members_digest(members):
+    return hashlib.sha256("\n".join(members).encode("utf-8")).hexdigest()
+
+
+def build_chunk_config(name, members, outbounds, config):
+    tags = [outbounds[h]["tag"] for h in members]
+    return {
+        "outbounds": [outbounds[h] for h in members],
+        "routing": {
+            "balancers": [
+                {
+                    "tag": f"balancer-{name}",
+                    "selector": tags,
+                    "strategy": {"type": config["balancer_strategy"]},
+                }
+            ]
+        },
+        "observatory": {
+            "subjectSelector": tags,
+            "probeURL": config["probe_url"],
+            "probeInterval": config["probe_interval"],
+            "enableConcurrency": True,
+        },
+    }
+
+
+def write_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
@@ -1,64 +1,169 @@
-import base64
-import os
-import tempfile
+import time
 import urllib.error
 import urllib.request
 
+from schedule import (
+    adaptive_enabled,
+    load_schedule,
+    record_source,
+    report_schedule,
+    scheduled_links,
+)
 
-def fetch_uris(ctx):
-    links = ctx.configs_map["LINKS"]
-    total_processed = 0
-    all_uris = set()
-    rejected_lines = set()
-    for url in links:
-        try:
-            content = fetch_url_content(url)
-            protocol_uris_temp, rejected_temp = parse_content_to_uris(content, ctx)
-            for uris in protocol_uris_temp.values():
-                all_uris.update(uris)
-            rejected_lines.update(rejected_temp)
-            total_processed += sum(
-                1 for line in content.strip().split("\n") if line.strip()
-            )
-        except Exception as e:
-            print(f"Error fetching {url}: {e}")
-            continue
-    db_path = ctx.configs_map["DB_PATH"]
-    schemas = ctx.configs_map["TABLE_SCHEMAS"]
-    ctx.database_map["ensure_table"](
-        db_path=db_path, table_name="uris_raw", columns=schemas["uris_raw"]
+
+def fetch_uris(ctx, links=None):
+    links = scheduled_links(ctx, links)
+    metrics = ctx.metrics
+    valid_before = prepare_fetch(ctx)
+    prefilter = ctx.known_filter()
+    schedule = load_schedule(ctx) if adaptive_enabled(ctx) else None
+    skipped = 0
+    writer = open_writer(ctx)
+    try:
+        with writer:
+            for url in links:
+                try:
+                    uris, rejected, sample = fetch_source(url, ctx)
+                    fresh = prefilter_known(uris, prefilter, ctx)
+                    skipped += len(uris) - len(fresh)
+                    if schedule is not None:
+                        sample["new_uris"] = count_new(fresh, writer, ctx)
+                    with metrics.span("fetch.enqueue"):
+                        upserted = save_uris_to_db(fresh, writer, ctx, source=url)
+                        save_rejected_to_db(rejected, writer, ctx)
+                    remember_known(fresh, prefilter)
+                    metrics.incr("fetch.uris_upserted", upserted)
+                except Exception as e:
+                    metrics.incr("fetch.sources_failed")
+                    print(f"Error fetching {url}: {e}")
+                    sample = None
+                if schedule is not None:
+                    record_source(ctx, writer, schedule, url, sample)
+    except Exception:
+        ctx.known_uris = None
+        raise
+    finish_fetch(ctx, valid_before, writer, skipped)
+    if schedule is not None:
+        report_schedule(ctx, schedule, links)
+    return None
+
+
+def count_new(uris, writer, ctx):
+    decode = ctx.processors_map["decode_url_encode"]
+    decoded = {decode(uri) for uri in uris}
+    known = writer.call(
+        lambda conn: ctx.database_map["select_existing"](
+            conn, "uris_raw", "uri", decoded
+        )
     )
-    ctx.database_map["ensure_table"](
-        db_path=db_path, table_name="uris_rejected", columns=schemas["uris_rejected"]
+    return len(decoded - known)
+
+
+def prepare_fetch(ctx):
+    ctx.ensure_table("uris_raw")
+    ctx.ensure_table("uris_rejected")
+    return ctx.database_map["count_records"](
+        db_path=ctx.configs_map["DB_PATH"], table_name="uris_raw"
+    )
+
+
+def open_writer(ctx):
+    write_behind = ctx.configs_map["WRITE_BEHIND"]
+    return ctx.database_map["write_behind_writer"](
+        ctx.configs_map["DB_PATH"],
+        max_pending=write_behind["max_pending_batches"],
+        group_size=write_behind["group_batches"],
     )
-    added_valid = save_uris_to_db(all_uris, db_path, ctx)
-    added_rejected = save_rejected_to_db(rejected_lines, db_path, ctx)
+
+
+def fetch_source(url, ctx):
+    metrics = ctx.metrics
+    started = time.monotonic()
+    with metrics.span("fetch.download"):
+        content = fetch_url_content(url)
+    with metrics.span("fetch.parse"):
+        decoded = [
+            line
+            for line in ctx.decoders_map["decode_content"](content, ctx)
+            if line.strip()
+        ]
+        protocol_uris_temp, rejected = parse_content_to_uris(decoded, ctx)
+        uris = set()
+        for proto_uris in protocol_uris_temp.values():
+            uris.update(proto_uris)
+        lines = len(decoded)
+    metrics.incr("fetch.sources_ok")
+    metrics.incr("fetch.bytes", len(content))
+    metrics.incr("fetch.lines", lines)
+    metrics.incr("fetch.uris_parsed", len(uris))
+    metrics.incr("fetch.uris_rejected", len(rejected))
+    metrics.incr("fetch.uris_deduped", lines - len(uris) - len(rejected))
+    sample = {
+        "bytes": len(content),
+        "seconds": time.monotonic() - started,
+        "uris": len(uris),
+        "rejected": len(rejected),
+    }
+    return uris, rejected, sample
+
+
+def prefilter_known(uris, prefilter, ctx):
+    if prefilter is None:
+        return uris
+    with ctx.metrics.span("fetch.prefilter"):
+        fresh = {uri for uri in uris if uri not in prefilter}
+    ctx.metrics.incr("fetch.prefilter_skipped", len(uris) - len(fresh))
+    return fresh
+
+
+def remember_known(uris, prefilter):
+    if prefilter is not None:
+        prefilter.update(uris)
+
+
+def finish_fetch(ctx, valid_before, writer, skipped=0):
+    db_path = ctx.configs_map["DB_PATH"]
+    added_rejected = writer.counts.get("uris_rejected", 0)
     total_valid = ctx.database_map["count_records"](
         db_path=db_path, table_name="uris_raw"
     )
+    added_valid = total_valid - valid_before
+    ctx.metrics.incr("fetch.uris_new", added_valid)
+    ctx.metrics.incr("fetch.rejected_new", added_rejected)
     total_rejected = ctx.database_map["count_records"](
         db_path=db_path, table_name="uris_rejected"
     )
     print(f"Fetch complete → {added_valid} new valid, {added_rejected} rejected")
     print(f"Total in DB → valid: {total_valid}, rejected: {total_rejected}")
-    return None
+    if ctx.known_uris is not None:
+        report_prefilter(ctx, skipped)
+    return added_valid
+
+
+def report_prefilter(ctx, skipped):
+    stats = ctx.known_uris.stats()
+    for name, value in stats.items():
+        ctx.metrics.counters[f"prefilter.{name}"] = value
+    print(
+        f"Prefilter → {skipped} known URIs skipped, {stats['entries']} entries "
+        f"in {stats['size_bytes'] / 1_048_576:.1f} MiB, "
+        f"est. false-positive rate {stats['estimated_error_rate']:.4%}"
+    )
+    if ctx.db_mode == "disk":
+        ctx.save_known_filter()
 
 
 def fetch_url_content(url):
     with urllib.request.urlopen(url) as response:
-        raw_content = response.read().decode("utf-8")
-    try:
-        decoded_bytes = base64.b64decode(raw_content)
-        return decoded_bytes.decode("utf-8")
-    except (ValueError, UnicodeDecodeError):
-        return raw_content
+        return response.read().decode("utf-8")
 
 
 def parse_content_to_uris(content, ctx):
     protocols_object = ctx.configs_map["PROXIES"]["PROTOCOLS"]
     valid_uris = {proto: set() for proto in protocols_object}
     rejected = set()
-    for line in content.splitlines():
+    lines = content.splitlines() if isinstance(content, str) else content
+    for line in lines:
         line = line.strip()
         if not line:
             continue
@@ -80,40 +185,35 @@ def parse_content_to_uris(content, ctx):
     return valid_uris, rejected
 
 
-def save_uris_to_db(uris_set, db_path, ctx):
+def save_uris_to_db(uris_set, writer, ctx, decoded=False, source=None):
     if not uris_set:
         return 0
-    with tempfile.NamedTemporaryFile(mode="w", encoding="utf-8", delete=False) as f:
-        for uri in sorted(uris_set):
-            decoded = ctx.processors_map["decode_url_encode"](uri)
-            f.write(decoded + "\n")
-        temp_path = f.name
-    try:
-        records = ctx.processors_map["uri_generator"](temp_path)
-        added = ctx.database_map["bulk_upsert"](
-            db_path=db_path,
-            table_name="uris_raw",
-            records=records,
-            key_columns="uri",
-        )
-        return added
-    finally:
-        try:
-            os.unlink(temp_path)
-        except OSError:
-            pass
+    if decoded:
+        records = [(uri, source) for uri in sorted(uris_set)]
+    else:
+        decode = ctx.processors_map["decode_url_encode"]
+        records = [(decode(uri), source) for uri in sorted(uris_set)]
+    sql = ctx.database_map["build_upsert_sql"](
+        "uris_raw", ["uri", "source"], "uri", touch_columns=["updated_at"]
+    )
+    writer.submit("uris_raw", sql, records)
+    return len(records)
 
 
-def save_rejected_to_db(rejected_lines_set, db_path, ctx):
+def save_rejected_to_db(rejected_lines_set, writer, ctx):
     if not rejected_lines_set:
         return 0
-    records = [(line.strip(),) for line in rejected_lines_set if line.strip()]
+    line_scheme = ctx.processors_map["line_scheme"]
+    records = [
+        (line.strip(), line_scheme(line.strip()))
+        for line in rejected_lines_set
+        if line.strip()
+    ]
     if not records:
         return 0
-    with ctx.database_map["get_db_connection"](db_path) as conn:
-        conn.executemany(
-            "INSERT OR IGNORE INTO uris_rejected (line) VALUES (?)",
-            records,
-        )
-        conn.commit()
+    writer.submit(
+        "uris_rejected",
+        "INSERT OR IGNORE INTO uris_rejected (line, scheme) VALUES (?, ?)",
+        records,
+    )
     return len(records)
@@ -0,0 +1,116 @@
+import json
+import os
+import re
+import sys
+from export import export_xray
+from transform import refresh_collapsed, rows_matching, sync_collapsed
+
+FILTER_COLUMNS = [
+    "protocol",
+    "security",
+    "transport",
+    "port",
+    "address",
+    "country",
+    "asn",
+]
+JSON_FIELD_PATTERN = re.compile(r"^[A-Za-z0-9_\-]+(\.[A-Za-z0-9_\-]+)*$")
+
+
+def load_uris(ctx):
+    uris_transform_path = ctx.configs_map["URIS_TRANSFORM_PATH"]
+    db_path = ctx.configs_map["DB_PATH"]
+    if not os.path.exists(uris_transform_path):
+        print(f"Nothing to load: {uris_transform_path} does not exist.")
+        return None
+    with open(uris_transform_path, encoding="utf-8") as f:
+        proxy_objects = json.load(f)
+    ctx.ensure_table("uris_transformed")
+    sync_collapsed(ctx)
+    loaded = save_transformed_to_db(proxy_objects, db_path, ctx)
+    ctx.metrics.incr("load.configs_upserted", loaded)
+    total = ctx.database_map["count_records"](
+        db_path=db_path, table_name="uris_transformed"
+    )
+    print(f"Load complete → {loaded} configs upserted, {total} total in DB")
+    with ctx.metrics.span("load.export"):
+        export_xray(ctx, query_proxies(ctx))
+    return None
+
+
+def save_transformed_to_db(proxy_objects, db_path, ctx):
+    to_record = ctx.processors_map["proxy_to_record"]
+    records = {}
+    for proxy_object in proxy_objects:
+        record = to_record(proxy_object)
+        records[record["hash"]] = record
+    if not records:
+        return 0
+    with ctx.database_map["get_db_connection"](db_path) as conn:
+        stored = dict(
+            rows_matching(
+                conn,
+                "SELECT hash, proxy_object FROM uris_transformed WHERE hash IN ({})",
+                records,
+            )
+        )
+        changed = [
+            record
+            for hash_val, record in records.items()
+            if stored.get(hash_val) != record["proxy_object"]
+        ]
+        if changed:
+            columns = list(changed[0])
+            conn.executemany(
+                ctx.database_map["build_upsert_sql"](
+                    "uris_transformed", columns, "hash", touch_columns=["updated_at"]
+                ),
+                [tuple(record[column] for column in columns) for record in changed],
+            )
+            refresh_collapsed(conn, ctx, {record["address"] for record in changed})
+        conn.commit()
+    return len(changed)
+
+
+def json_path(field):
+    if not JSON_FIELD_PATTERN.match(field):
+        raise ValueError(f"Invalid field path: {field}")
+    return "$." + ".".join(f'"{part}"' for part in field.split("."))
+
+
+def query_proxies(ctx, filters=None, has=(), match=None, limit=None, batch_size=1000):
+    filters = {k: v for k, v in (filters or {}).items() if v is not None}
+    conditions = ["collapsed = 0"]
+    params = []
+    for column in FILTER_COLUMNS:
+        if column in filters:
+            conditions.append(f"{column} = ?")
+            params.append(filters[column])
+    for field in has:
+        conditions.append("json_extract(proxy_object, ?) IS NOT NULL")
+        params.append(json_path(field))
+    for field, value in (match or {}).items():
+        conditions.append("json_extract(proxy_object, ?) = ?")
+        params.extend([json_path(field), value])
+    sql = "SELECT proxy_object FROM uris_transformed WHERE " + " AND ".join(conditions)
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    ctx.ensure_table("uris_transformed")
+    with ctx.database_map["get_db_connection"](ctx.configs_map["DB_PATH"]) as conn:
+        cur = conn.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield json.loads(row[0])
+
+
+def query_uris(ctx, filters, has=(), match=None, limit=None):
+    count = 0
+    for proxy_object in query_proxies(ctx, filters, has, match, limit):
+        print(json.dumps(proxy_object, ensure_ascii=False))
+        count += 1
+    print(f"Query complete → {count} configs matched", file=sys.stderr)
+    return None
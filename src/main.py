@@ -1,3 +1,5 @@
+import argparse
+import json
 import sys
 import os
 
@@ -6,22 +8,241 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from context import AppContext
 from fetch import fetch_uris
 from transform import transform_uris
+from retention import archive_uris, rehydrate_uris
+from load import load_uris, query_uris
+from serve import serve
+from pipeline import run_fused
+from probe import probe_uris
+from publish import publish_uris
+from enrich import enrich_uris
+from resolve import resolve_uris
+from merge import merge_shards
+from reclassify import reclassify_rejected
+
+READ_ONLY_COMMANDS = {"query"}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.main")
+    parser.add_argument(
+        "command",
+        type=str.lower,
+        choices=[
+            "fetch",
+            "transform",
+            "load",
+            "all",
+            "archive",
+            "rehydrate",
+            "query",
+            "serve",
+            "probe",
+            "publish",
+            "enrich",
+            "resolve",
+            "merge",
+            "reclassify",
+        ],
+    )
+    parser.add_argument("partition", nargs="?", default="")
+    parser.add_argument(
+        "--db-mode",
+        choices=["disk", "memory"],
+        default="disk",
+        help="run every stage against an in-memory copy and snapshot it at the end",
+    )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="run all as separate fetch and transform passes through the database",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="fetch only the sources assigned to shard I of N into its own database",
+    )
+    parser.add_argument(
+        "--all-sources",
+        action="store_true",
+        help="fetch every source now, ignoring the adaptive schedule",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        metavar="SECONDS",
+        help="stop transforming once the next chunk would overrun this many seconds",
+    )
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        metavar="N",
+        help="transform at most N backlog rows, in the configured priority order",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profile",
+        metavar="DIR",
+        help="dump cProfile stats and tracemalloc peaks per stage into DIR",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        metavar="PATH",
+        help="write stage timings and counters as a JSON run report",
+    )
+    query = parser.add_argument_group("query options")
+    query.add_argument("--protocol")
+    query.add_argument("--security")
+    query.add_argument("--transport")
+    query.add_argument("--port", type=int)
+    query.add_argument("--address")
+    query.add_argument("--country", type=str.upper)
+    query.add_argument("--asn", type=int)
+    query.add_argument(
+        "--has",
+        action="append",
+        default=[],
+        metavar="FIELD",
+        help="require a field inside the proxy object, e.g. protocol.obfs",
+    )
+    query.add_argument(
+        "--match",
+        action="append",
+        default=[],
+        metavar="FIELD=VALUE",
+        help="require a field inside the proxy object to equal a value",
+    )
+    query.add_argument("--limit", type=int)
+    return parser
+
+
+def parse_shard(value):
+    index, _, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N, got {value!r}")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..N-1: {value!r}")
+    return index, count
+
+
+def forced_links(ctx, args):
+    return ctx.configs_map["LINKS"] if args.all_sources else None
+
+
+def parse_match(items):
+    match = {}
+    for item in items:
+        field, _, value = item.partition("=")
+        try:
+            match[field] = json.loads(value)
+        except json.JSONDecodeError:
+            match[field] = value
+    return match
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python -m src.main [fetch|transform|all]")
-        sys.exit(1)
-    ctx = AppContext()
-    command = sys.argv[1].lower()
-    if command in ["fetch", "all"]:
-        print("Fetching new proxies...")
-        fetch_uris(ctx)
-    if command in ["transform", "all"]:
-        print("Transforming and deduplicating...")
-        transform_uris(ctx)
-    print("Optimizing database size...")
-    ctx.database_map["optimize_database"](db_path=ctx.configs_map["DB_PATH"])
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.shard is not None and args.command != "fetch":
+        parser.error("--shard only applies to fetch")
+    budgeted = args.time_budget is not None or args.max_rows is not None
+    if budgeted and not (
+        args.command == "transform" or args.command == "all" and args.sequential
+    ):
+        parser.error(
+            "--time-budget and --max-rows only apply to transform and all --sequential"
+        )
+    ctx = AppContext(db_mode=args.db_mode, profile_dir=args.profile, shard=args.shard)
+    try:
+        run_command(ctx, args)
+        if args.command in READ_ONLY_COMMANDS:
+            return
+        with ctx.metrics.stage("optimize"):
+            print("Optimizing database size...")
+            ctx.database_map["optimize_database"](db_path=ctx.configs_map["DB_PATH"])
+        if ctx.db_mode == "memory":
+            with ctx.metrics.stage("persist"):
+                print("Writing database snapshot to disk...")
+                ctx.persist()
+        print("Stage timings:")
+        ctx.metrics.print_summary()
+    finally:
+        ctx.close()
+        if args.metrics_json:
+            ctx.metrics.write_json(
+                args.metrics_json, command=args.command, db_mode=args.db_mode
+            )
+
+
+def run_command(ctx, args):
+    command = args.command
+    metrics = ctx.metrics
+    fused = command == "all" and not args.sequential
+    if fused:
+        with metrics.stage("fused"):
+            print("Fetching and transforming new proxies...")
+            run_fused(ctx, links=forced_links(ctx, args))
+    if command == "fetch" or command == "all" and not fused:
+        with metrics.stage("fetch"):
+            print("Fetching new proxies...")
+            fetch_uris(ctx, links=forced_links(ctx, args))
+    if command == "transform" or command == "all" and not fused:
+        with metrics.stage("transform"):
+            print("Transforming and deduplicating...")
+            transform_uris(ctx, time_budget=args.time_budget, max_rows=args.max_rows)
+    if command in ["load", "all"]:
+        with metrics.stage("load"):
+            print("Loading transformed proxies...")
+            load_uris(ctx)
+    if command in ["resolve", "all"]:
+        with metrics.stage("resolve"):
+            print("Resolving domain addresses...")
+            resolve_uris(ctx)
+    if command in ["enrich", "all"]:
+        with metrics.stage("enrich"):
+            print("Tagging proxies with country and ASN...")
+            enrich_uris(ctx)
+    if command in ["publish", "all"]:
+        with metrics.stage("publish"):
+            print("Publishing subscription shards...")
+            publish_uris(ctx)
+    if command == "merge":
+        with metrics.stage("merge"):
+            print("Merging shard databases...")
+            merge_shards(ctx)
+    if command == "reclassify":
+        with metrics.stage("reclassify"):
+            print("Reclassifying rejected lines...")
+            reclassify_rejected(ctx)
+    if command == "query":
+        filters = {
+            "protocol": args.protocol,
+            "security": args.security,
+            "transport": args.transport,
+            "port": args.port,
+            "address": args.address,
+            "country": args.country,
+            "asn": args.asn,
+        }
+        query_uris(ctx, filters, args.has, parse_match(args.match), args.limit)
+    if command == "probe":
+        with metrics.stage("probe"):
+            print("Probing transformed proxies...")
+            probe_uris(ctx)
+    if command == "serve":
+        with metrics.stage("serve"):
+            serve(ctx)
+    if command == "archive":
+        with metrics.stage("archive"):
+            print("Archiving stale URIs...")
+            archive_uris(ctx)
+    if command == "rehydrate":
+        with metrics.stage("rehydrate"):
+            print("Rehydrating archived URIs...")
+            rehydrate_uris(ctx, args.partition)
 
 
 if __name__ == "__main__":
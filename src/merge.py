@@ -0,0 +1,120 @@
+import glob
+import os
+
+MERGE_TABLES = {
+    "uris_raw": ("uri", ["source"]),
+    "uris_rejected": ("line", ["scheme"]),
+}
+
+STATE_UPSERT_SQL = """
+    INSERT INTO pipeline_state (name, cursor, watermark) VALUES (?, ?, ?)
+    ON CONFLICT(name) DO UPDATE SET
+        cursor = excluded.cursor,
+        watermark = excluded.watermark,
+        updated_at = CURRENT_TIMESTAMP
+""".strip()
+
+
+def merge_shards(ctx):
+    shard_dir = ctx.configs_map["SHARDS"]["dir"]
+    paths = sorted(glob.glob(os.path.join(shard_dir, "shard-*.db")))
+    if not paths:
+        print(f"Nothing to merge: no shard databases in {shard_dir}.")
+        return None
+    for table_name in MERGE_TABLES:
+        ctx.ensure_table(table_name)
+    ctx.ensure_table("pipeline_state")
+    totals = {}
+    for path in paths:
+        with ctx.metrics.span("merge.shard"):
+            merged = merge_shard(ctx, path)
+        for table_name, count in merged.items():
+            totals[table_name] = totals.get(table_name, 0) + count
+            ctx.metrics.incr(f"merge.{table_name}_rows", count)
+        details = ", ".join(f"{count} {name}" for name, count in merged.items())
+        print(f"   → {os.path.basename(path)}: {details or 'empty'}")
+    total = ctx.database_map["count_records"](
+        db_path=ctx.configs_map["DB_PATH"], table_name="uris_raw"
+    )
+    print(
+        f"Merge complete → {totals.get('uris_raw', 0)} URIs merged from {len(paths)} shards, "
+        f"{total} total in DB"
+    )
+    return totals
+
+
+def merge_shard(ctx, path):
+    name = os.path.basename(path)
+    merged = {}
+    conn = ctx.database_map["get_db_connection"](
+        ctx.configs_map["DB_PATH"], row_factory=None
+    )
+    try:
+        conn.execute("ATTACH DATABASE ? AS shard", (path,))
+    except Exception:
+        conn.close()
+        raise
+    try:
+        shard_tables = {
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM shard.sqlite_master WHERE type = 'table'"
+            )
+        }
+        for table_name, (key_column, extra_columns) in MERGE_TABLES.items():
+            if table_name not in shard_tables:
+                continue
+            state_name = f"merge:{name}:{table_name}"
+            cursor, watermark = conn.execute(
+                "SELECT cursor, watermark FROM pipeline_state WHERE name = ?",
+                (state_name,),
+            ).fetchone() or (0, "")
+            high_rowid, high_updated_at, settled_at = conn.execute(
+                f"SELECT MAX(rowid), MAX(updated_at), datetime('now', '-1 seconds') "
+                f"FROM shard.{table_name}"
+            ).fetchone()
+            if high_rowid is None:
+                continue
+            merged[table_name] = conn.execute(
+                build_merge_sql(table_name, key_column, extra_columns),
+                (cursor, high_rowid, cursor, watermark or ""),
+            ).rowcount
+            conn.execute(
+                STATE_UPSERT_SQL,
+                (
+                    state_name,
+                    high_rowid,
+                    max(min(high_updated_at or "", settled_at), watermark or ""),
+                ),
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("DETACH DATABASE shard")
+        conn.close()
+    return merged
+
+
+def build_merge_sql(table_name, key_column, extra_columns=()):
+    columns = ", ".join([key_column, *extra_columns, "created_at", "updated_at"])
+    assignments = ",\n            ".join(
+        [
+            *(
+                f"{column} = COALESCE(excluded.{column}, {table_name}.{column})"
+                for column in extra_columns
+            ),
+            f"created_at = MIN({table_name}.created_at, excluded.created_at)",
+            f"updated_at = MAX({table_name}.updated_at, excluded.updated_at)",
+        ]
+    )
+    return f"""
+        INSERT INTO {table_name} ({columns})
+        SELECT {columns} FROM shard.{table_name} WHERE rowid > ? AND rowid <= ?
+        UNION ALL
+        SELECT {columns} FROM shard.{table_name}
+        WHERE rowid <= ? AND updated_at > ?
+        ON CONFLICT({key_column}) DO UPDATE SET
+            {assignments}
+    """.strip()
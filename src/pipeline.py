@@ -0,0 +1,144 @@
+from fetch import (
+    prepare_fetch,
+    open_writer,
+    fetch_source,
+    save_uris_to_db,
+    save_rejected_to_db,
+    prefilter_known,
+    remember_known,
+    finish_fetch,
+)
+from schedule import (
+    adaptive_enabled,
+    load_schedule,
+    record_source,
+    report_schedule,
+    scheduled_links,
+)
+from transform import (
+    transform_batch,
+    export_transformed,
+    open_checkpoint,
+    close_checkpoint,
+    write_batch,
+    report_collapsed,
+    report_transform,
+    report_rejections,
+    requeue_changed,
+    sync_collapsed,
+)
+
+BACKLOG_SQL = """
+    SELECT rowid, uri FROM uris_raw
+    WHERE processed = 0 AND rowid > ?
+    ORDER BY rowid LIMIT ?
+""".strip()
+
+
+def run_fused(ctx, links=None):
+    links = scheduled_links(ctx, links)
+    uris_transform_path = ctx.configs_map["URIS_TRANSFORM_PATH"]
+    metrics = ctx.metrics
+    decode = ctx.processors_map["decode_url_encode"]
+    valid_before = prepare_fetch(ctx)
+    ctx.ensure_table("uris_transformed")
+    ctx.ensure_table("pipeline_state")
+    requeue_changed(ctx)
+    sync_collapsed(ctx)
+    run_id, _ = open_checkpoint(ctx)
+    seen_hashes = set()
+    totals = {"loaded": 0, "processed": 0, "hashed": 0, "invalid": 0}
+    prefilter = ctx.known_filter()
+    schedule = load_schedule(ctx) if adaptive_enabled(ctx) else None
+    skipped = 0
+    writer = open_writer(ctx)
+    try:
+        with writer:
+            for page in backlog_pages(ctx, writer):
+                batch = transform_batch((uri for _, uri in page), ctx, seen_hashes)
+                submit_batch(ctx, writer, batch, run_id)
+                merge_batch(totals, batch)
+            if totals["loaded"]:
+                print(
+                    f"Transformed {totals['loaded']} URIs left unprocessed by earlier runs"
+                )
+            for url in links:
+                try:
+                    uris, rejected, sample = fetch_source(url, ctx)
+                    unseen = prefilter_known(uris, prefilter, ctx)
+                    skipped += len(uris) - len(unseen)
+                    decoded = {decode(uri) for uri in unseen}
+                    with metrics.span("fused.lookup"):
+                        known = writer.call(
+                            lambda conn: ctx.database_map["select_existing"](
+                                conn, "uris_raw", "uri", decoded
+                            )
+                        )
+                    fresh = sorted(decoded - known)
+                    sample["new_uris"] = len(fresh)
+                    metrics.incr("fused.uris_known", len(known))
+                    metrics.incr("fused.uris_fresh", len(fresh))
+                    with metrics.span("fetch.enqueue"):
+                        save_uris_to_db(known, writer, ctx, decoded=True, source=url)
+                        save_rejected_to_db(rejected, writer, ctx)
+                    batch = transform_batch(fresh, ctx, seen_hashes)
+                    with metrics.span("fused.enqueue"):
+                        submit_batch(ctx, writer, batch, run_id, source=url)
+                    remember_known(unseen, prefilter)
+                    merge_batch(totals, batch)
+                except Exception as e:
+                    metrics.incr("fetch.sources_failed")
+                    print(f"Error fetching {url}: {e}")
+                    sample = None
+                if schedule is not None:
+                    record_source(ctx, writer, schedule, url, sample)
+    except Exception:
+        ctx.known_uris = None
+        raise
+    finish_fetch(ctx, valid_before, writer, skipped)
+    if schedule is not None:
+        report_schedule(ctx, schedule, links)
+    with metrics.span("transform.write"):
+        unique = export_transformed(ctx, run_id, uris_transform_path)
+    close_checkpoint(ctx)
+    report_collapsed(ctx)
+    report_transform(
+        totals["loaded"],
+        unique,
+        totals["processed"],
+        totals["hashed"],
+        totals["invalid"],
+    )
+    report_rejections(ctx)
+    return None
+
+
+def backlog_pages(ctx, writer):
+    page_size = ctx.configs_map["TRANSFORM"]["chunk_size"]
+    last_rowid = 0
+    while True:
+        page = writer.call(
+            lambda conn: conn.execute(BACKLOG_SQL, (last_rowid, page_size)).fetchall()
+        )
+        if not page:
+            break
+        yield page
+        last_rowid = page[-1][0]
+        if len(page) < page_size:
+            break
+
+
+def submit_batch(ctx, writer, batch, run_id, source=None):
+    if not batch["uri_to_processed"]:
+        return
+    writer.submit_call(
+        "uris_transformed",
+        lambda conn: write_batch(conn, ctx, batch, run_id, source=source),
+    )
+
+
+def merge_batch(totals, batch):
+    totals["loaded"] += batch["loaded"]
+    totals["processed"] += len(batch["uri_to_processed"])
+    totals["hashed"] += len(batch["uri_to_hash"])
+    totals["invalid"] += batch["invalid_addresses"]
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import random
+import ssl
+
+PROBE_UPSERT_SQL = """
+    INSERT INTO proxy_probes (
+        hash, address, port, reachable, connect_ms, handshake_ms, error,
+        last_checked_at, last_success_at, failures
+    )
+    VALUES (
+        ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP,
+        CASE WHEN ? THEN CURRENT_TIMESTAMP END, CASE WHEN ? THEN 0 ELSE 1 END
+    )
+    ON CONFLICT(hash) DO UPDATE SET
+        address = excluded.address,
+        port = excluded.port,
+        reachable = excluded.reachable,
+        connect_ms = excluded.connect_ms,
+        handshake_ms = excluded.handshake_ms,
+        error = excluded.error,
+        last_checked_at = excluded.last_checked_at,
+        last_success_at = COALESCE(excluded.last_success_at, proxy_probes.last_success_at),
+        failures = CASE WHEN excluded.reachable THEN 0 ELSE proxy_probes.failures + 1 END,
+        updated_at = CURRENT_TIMESTAMP
+""".strip()
+
+
+def probe_uris(ctx):
+    config = ctx.configs_map["PROBE"]
+    ctx.ensure_table("uris_transformed")
+    ctx.ensure_table("proxy_probes")
+    targets = select_targets(ctx, config)
+    print(f"Probing {len(targets)} proxies...")
+    pending = []
+    summary = {"ok": 0, "failed": 0}
+
+    def on_result(result):
+        summary["ok" if result["reachable"] else "failed"] += 1
+        pending.append(result)
+        if len(pending) >= config["flush_every"]:
+            save_probe_results(ctx, pending)
+            pending.clear()
+
+    with ctx.metrics.span("probe.run"):
+        asyncio.run(probe_targets(targets, config, on_result))
+    save_probe_results(ctx, pending)
+    ctx.metrics.incr("probe.reachable", summary["ok"])
+    ctx.metrics.incr("probe.unreachable", summary["failed"])
+    print(f"Probe complete → {summary['ok']} reachable, {summary['failed']} failed")
+    return None
+
+
+def select_targets(ctx, config):
+    skip = tuple(config["skip_protocols"])
+    sql = """
+        SELECT t.hash, t.address, COALESCE(t.resolved_ip, t.address), t.port,
+            t.security, t.proxy_object
+        FROM uris_transformed AS t
+        LEFT JOIN proxy_probes AS p ON p.hash = t.hash
+        WHERE t.collapsed = 0
+            AND (p.last_checked_at IS NULL OR p.last_checked_at < datetime('now', ?))
+    """
+    params = [f"-{config['recheck_after']} seconds"]
+    if skip:
+        sql += f" AND t.protocol NOT IN ({', '.join(['?'] * len(skip))})"
+        params.extend(skip)
+    targets = []
+    with ctx.database_map["get_db_connection"](ctx.configs_map["DB_PATH"]) as conn:
+        for row in conn.execute(sql, params):
+            hash_val, address, connect_to, port, security, proxy_object = tuple(row)
+            tls = security in config["tls_securities"]
+            server_name = None
+            if tls:
+                server_name = json.loads(proxy_object)["security"].get("sni") or address
+            targets.append((hash_val, address, connect_to, port, tls, server_name))
+    random.shuffle(targets)
+    return targets
+
+
+async def probe_targets(targets, config, on_result):
+    queue = asyncio.Queue()
+    for target in targets:
+        queue.put_nowait(target)
+    limiter = HostRateLimiter(config["per_host_interval"])
+    ssl_context = make_ssl_context()
+    workers = [
+        asyncio.create_task(
+            probe_worker(queue, limiter, ssl_context, config["timeout"], on_result)
+        )
+        for _ in range(min(config["concurrency"], len(targets)))
+    ]
+    await asyncio.gather(*workers)
+
+
+async def probe_worker(queue, limiter, ssl_context, timeout, on_result):
+    while True:
+        try:
+            target = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        hash_val, address, connect_to, port, tls, server_name = target
+        await limiter.acquire(connect_to)
+        result = await probe_endpoint(
+            connect_to, port, tls, server_name, ssl_context, timeout
+        )
+        result.update({"hash": hash_val, "address": address, "port": port})
+        on_result(result)
+
+
+async def probe_endpoint(address, port, tls, server_name, ssl_context, timeout):
+    loop = asyncio.get_running_loop()
+    result = {"reachable": False, "connect_ms": None, "handshake_ms": None}
+    writer = None
+    try:
+        started = loop.time()
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(address, port), timeout
+        )
+        result["connect_ms"] = (loop.time() - started) * 1000
+        if tls:
+            started = loop.time()
+            transport = writer.transport
+            await asyncio.wait_for(
+                loop.start_tls(
+                    transport,
+                    transport.get_protocol(),
+                    ssl_context,
+                    server_hostname=server_name,
+                ),
+                timeout,
+            )
+            result["handshake_ms"] = (loop.time() - started) * 1000
+        result["reachable"] = True
+        result["error"] = None
+    except asyncio.TimeoutError:
+        result["error"] = "timeout"
+    except ssl.SSLError as e:
+        result["error"] = f"tls:{e.reason or 'error'}"
+    except OSError as e:
+        result["error"] = f"os:{e.errno or type(e).__name__}"
+    finally:
+        if writer is not None:
+            writer.transport.abort()
+    return result
+
+
+def make_ssl_context():
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+class HostRateLimiter:
+    def __init__(self, interval):
+        self.interval = interval
+        self.next_slot = {}
+
+    async def acquire(self, host):
+        if self.interval <= 0:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self.next_slot.get(host, now))
+        self.next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def save_probe_results(ctx, results):
+    if not results:
+        return 0
+    rows = [
+        (
+            r["hash"],
+            r["address"],
+            r["port"],
+            int(r["reachable"]),
+            r["connect_ms"],
+            r["handshake_ms"],
+            r["error"],
+            int(r["reachable"]),
+            int(r["reachable"]),
+        )
+        for r in results
+    ]
+    with ctx.database_map["get_db_connection"](ctx.configs_map["DB_PATH"]) as conn:
+        conn.executemany(PROBE_UPSERT_SQL, rows)
+        conn.commit()
+    return len(rows)
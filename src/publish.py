@@ -0,0 +1,130 @@
+import base64
+import hashlib
+import json
+import os
+
+from transform import sync_collapsed
+
+
+def publish_uris(ctx):
+    config = ctx.configs_map["PUBLISH"]
+    output_dir = config["output_dir"]
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    previous = read_manifest(manifest_path)
+    os.makedirs(output_dir, exist_ok=True)
+    ctx.ensure_table("uris_transformed")
+    sync_collapsed(ctx)
+    shards = {}
+    summary = dict.fromkeys(
+        [
+            "shards_added",
+            "shards_changed",
+            "shards_unchanged",
+            "shards_removed",
+            "proxies_added",
+            "proxies_removed",
+        ],
+        0,
+    )
+    for name, proxy_objects in iter_shards(ctx, config):
+        shards[name] = publish_shard(
+            output_dir, name, proxy_objects, previous["shards"].get(name), summary, ctx
+        )
+    for name, entry in previous["shards"].items():
+        if name in shards:
+            continue
+        for extension in ("txt", "json"):
+            path = os.path.join(output_dir, f"{name}.{extension}")
+            if os.path.exists(path):
+                os.remove(path)
+        summary["shards_removed"] += 1
+        summary["proxies_removed"] += entry["count"]
+    manifest = {"version": 1, "shards": dict(sorted(shards.items()))}
+    if manifest != previous:
+        write_atomic(manifest_path, json.dumps(manifest, indent=2) + "\n")
+    for name, value in summary.items():
+        ctx.metrics.incr(f"publish.{name}", value)
+    total = sum(entry["count"] for entry in shards.values())
+    print(
+        f"Publish complete → {total} proxies in {len(shards)} shards: "
+        f"{summary['shards_added']} added, {summary['shards_changed']} changed, "
+        f"{summary['shards_removed']} removed, {summary['shards_unchanged']} unchanged "
+        f"(+{summary['proxies_added']} / -{summary['proxies_removed']} proxies)"
+    )
+    return summary
+
+
+def stored_proxies(ctx):
+    rows = ctx.database_map["select_iter"](
+        db_path=ctx.configs_map["DB_PATH"],
+        table_name="uris_transformed",
+        columns=["protocol", "proxy_object"],
+        where_clause="collapsed = 0",
+        order_by="protocol, hash",
+    )
+    return ((protocol, json.loads(proxy_object)) for protocol, proxy_object in rows)
+
+
+def iter_shards(ctx, config):
+    prefix_length = config["shard_prefix_length"]
+    current = None
+    proxy_objects = []
+    for protocol, proxy_object in stored_proxies(ctx):
+        name = f"{protocol}/{proxy_object['hash'][:prefix_length]}"
+        if name != current and proxy_objects:
+            yield current, proxy_objects
+            proxy_objects = []
+        current = name
+        proxy_objects.append(proxy_object)
+    if proxy_objects:
+        yield current, proxy_objects
+
+
+def publish_shard(output_dir, name, proxy_objects, previous, summary, ctx):
+    to_uri = ctx.processors_map["proxy_to_uri"]
+    subscription = "\n".join(to_uri(obj) for obj in proxy_objects)
+    bodies = {
+        "txt": base64.b64encode(subscription.encode("utf-8")).decode("ascii") + "\n",
+        "json": json.dumps(proxy_objects, indent=2, ensure_ascii=False) + "\n",
+    }
+    entry = {"count": len(proxy_objects)}
+    for extension, body in bodies.items():
+        entry[f"{extension}_sha256"] = hashlib.sha256(body.encode("utf-8")).hexdigest()
+    paths = {ext: os.path.join(output_dir, f"{name}.{ext}") for ext in bodies}
+    if entry == previous and all(os.path.exists(path) for path in paths.values()):
+        summary["shards_unchanged"] += 1
+        return entry
+    hashes = {obj["hash"] for obj in proxy_objects}
+    previous_hashes = set()
+    if previous is None:
+        summary["shards_added"] += 1
+    else:
+        summary["shards_changed"] += 1
+        previous_hashes = read_shard_hashes(paths["json"])
+    summary["proxies_added"] += len(hashes - previous_hashes)
+    summary["proxies_removed"] += len(previous_hashes - hashes)
+    os.makedirs(os.path.dirname(paths["txt"]), exist_ok=True)
+    for extension, body in bodies.items():
+        write_atomic(paths[extension], body)
+    return entry
+
+
+def read_shard_hashes(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {obj["hash"] for obj in json.load(f)}
+
+
+def read_manifest(path):
+    if not os.path.exists(path):
+        return {"version": 1, "shards": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_atomic(path, body):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(body)
+    os.replace(tmp_path, path)
@@ -0,0 +1,69 @@
+from fetch import parse_content_to_uris
+
+
+def reclassify_rejected(ctx):
+    db_path = ctx.configs_map["DB_PATH"]
+    batch_size = ctx.configs_map["RECLASSIFY"]["batch_size"]
+    ctx.ensure_table("uris_raw")
+    ctx.ensure_table("uris_rejected")
+    backfilled = backfill_schemes(ctx, batch_size)
+    schemes = list(ctx.configs_map["PROXIES"]["PROTOCOLS"])
+    placeholders = ", ".join(["?"] * len(schemes))
+    pages = ctx.database_map["select_pages"](
+        db_path=db_path,
+        table_name="uris_rejected",
+        columns=["line"],
+        where_clause=f"scheme IN ({placeholders}) AND processed = 0",
+        params=schemes,
+        page_size=batch_size,
+    )
+    decode = ctx.processors_map["decode_url_encode"]
+    upsert_sql = ctx.database_map["build_upsert_sql"](
+        "uris_raw", ["uri"], "uri", touch_columns=["updated_at"]
+    )
+    summary = {"moved": 0, "kept": 0}
+    with ctx.metrics.span("reclassify.batches"):
+        for page in pages:
+            valid, rejected = parse_content_to_uris(
+                "\n".join(line for _, line in page), ctx
+            )
+            uris = sorted({decode(uri) for found in valid.values() for uri in found})
+            moved = [(rowid,) for rowid, line in page if line not in rejected]
+            kept = [(rowid,) for rowid, line in page if line in rejected]
+            with ctx.database_map["get_db_connection"](db_path) as conn:
+                conn.executemany(upsert_sql, [(uri,) for uri in uris])
+                conn.executemany("DELETE FROM uris_rejected WHERE rowid = ?", moved)
+                conn.executemany(
+                    "UPDATE uris_rejected SET processed = 1 WHERE rowid = ?", kept
+                )
+            summary["moved"] += len(moved)
+            summary["kept"] += len(kept)
+    ctx.metrics.incr("reclassify.moved", summary["moved"])
+    ctx.metrics.incr("reclassify.kept", summary["kept"])
+    ctx.metrics.incr("reclassify.schemes_backfilled", backfilled)
+    print(
+        f"Reclassify complete → {summary['moved']} lines moved to uris_raw, "
+        f"{summary['kept']} still rejected, {backfilled} schemes backfilled"
+    )
+    return summary
+
+
+def backfill_schemes(ctx, batch_size):
+    db_path = ctx.configs_map["DB_PATH"]
+    line_scheme = ctx.processors_map["line_scheme"]
+    pages = ctx.database_map["select_pages"](
+        db_path=db_path,
+        table_name="uris_rejected",
+        columns=["line"],
+        where_clause="scheme IS NULL",
+        page_size=batch_size,
+    )
+    backfilled = 0
+    for page in pages:
+        with ctx.database_map["get_db_connection"](db_path) as conn:
+            conn.executemany(
+                "UPDATE uris_rejected SET scheme = ? WHERE rowid = ?",
+                [(line_scheme(line), rowid) for rowid, line in page],
+            )
+        backfilled += len(page)
+    return backfilled
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import struct
+
+from transform import refresh_collapsed
+from utils.resolvers import ResolveError, ip_literal
+
+DNS_UPSERT_SQL = """
+    INSERT INTO dns_cache (host, addresses, resolved_ip, error, expires_at)
+    VALUES (?, ?, ?, ?, datetime('now', ?))
+    ON CONFLICT(host) DO UPDATE SET
+        addresses = excluded.addresses,
+        resolved_ip = excluded.resolved_ip,
+        error = excluded.error,
+        expires_at = excluded.expires_at,
+        updated_at = CURRENT_TIMESTAMP
+""".strip()
+
+RESOLVED_UPDATE_SQL = """
+    UPDATE uris_transformed
+    SET resolved_ip = (SELECT resolved_ip FROM dns_cache WHERE host = address),
+        geo_version = NULL
+    WHERE address IN (SELECT host FROM dns_cache)
+      AND resolved_ip IS NOT (SELECT resolved_ip FROM dns_cache WHERE host = address)
+""".strip()
+
+REPOINTED_SELECT_SQL = """
+    SELECT DISTINCT address, resolved_ip FROM uris_transformed
+    WHERE address IN (SELECT host FROM dns_cache)
+      AND resolved_ip IS NOT (SELECT resolved_ip FROM dns_cache WHERE host = address)
+""".strip()
+
+LITERAL_UPDATE_SQL = """
+    UPDATE uris_transformed SET resolved_ip = ?, geo_version = NULL
+    WHERE address = ? AND resolved_ip IS NULL
+""".strip()
+
+
+def resolve_uris(ctx):
+    config = ctx.configs_map["RESOLVE"]
+    if not config["enabled"]:
+        return None
+    ctx.ensure_table("uris_transformed")
+    ctx.ensure_table("dns_cache")
+    resolver = ctx.resolvers_map[config["resolver"]]
+    hosts, literals = select_hosts(ctx)
+    print(f"Resolving {len(hosts)} domains with the {config['resolver']} resolver...")
+    pending = []
+    summary = {"resolved": 0, "failed": 0}
+
+    def on_result(host, addresses, ttl, error):
+        summary["failed" if error else "resolved"] += 1
+        pending.append(cache_row(host, addresses, ttl, error, config))
+        if len(pending) >= config["flush_every"]:
+            save_dns_results(ctx, pending)
+            pending.clear()
+
+    with ctx.metrics.span("resolve.run"):
+        asyncio.run(resolve_hosts(hosts, resolver, config, on_result))
+    save_dns_results(ctx, pending)
+    with ctx.database_map["get_db_connection"](ctx.configs_map["DB_PATH"]) as conn:
+        updated = conn.executemany(LITERAL_UPDATE_SQL, literals).rowcount
+        repointed = {
+            value
+            for row in conn.execute(REPOINTED_SELECT_SQL)
+            for value in row
+            if value is not None
+        }
+        updated += conn.execute(RESOLVED_UPDATE_SQL).rowcount
+        refresh_collapsed(conn, ctx, repointed)
+    ctx.metrics.incr("resolve.resolved", summary["resolved"])
+    ctx.metrics.incr("resolve.failed", summary["failed"])
+    ctx.metrics.incr("resolve.rows_updated", updated)
+    print(
+        f"Resolve complete → {summary['resolved']} resolved, "
+        f"{summary['failed']} failed, {updated} configs re-pointed"
+    )
+    return summary
+
+
+def select_hosts(ctx):
+    sql = """
+        SELECT DISTINCT t.address, t.resolved_ip IS NULL
+        FROM uris_transformed AS t
+        LEFT JOIN dns_cache AS d ON d.host = t.address
+        WHERE d.expires_at IS NULL OR d.expires_at <= CURRENT_TIMESTAMP
+    """
+    hosts = set()
+    literals = []
+    with ctx.database_map["get_db_connection"](ctx.configs_map["DB_PATH"]) as conn:
+        for address, unresolved in conn.execute(sql):
+            if not address:
+                continue
+            literal = ip_literal(address)
+            if literal is None:
+                hosts.add(address)
+            elif unresolved:
+                literals.append((literal, address))
+    return sorted(hosts), literals
+
+
+async def resolve_hosts(hosts, resolver, config, on_result):
+    queue = asyncio.Queue()
+    for host in hosts:
+        queue.put_nowait(host)
+    workers = [
+        asyncio.create_task(resolve_worker(queue, resolver, config, on_result))
+        for _ in range(min(config["concurrency"], len(hosts)))
+    ]
+    await asyncio.gather(*workers)
+
+
+async def resolve_worker(queue, resolver, config, on_result):
+    while True:
+        try:
+            host = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        addresses, ttl, error = [], None, None
+        try:
+            addresses, ttl = await asyncio.wait_for(
+                resolver(host, config), config["timeout"]
+            )
+        except asyncio.TimeoutError:
+            error = "timeout"
+        except ResolveError as e:
+            error = str(e)
+        except OSError as e:
+            error = f"os:{e.errno or type(e).__name__}"
+        except (UnicodeError, ValueError, struct.error, IndexError) as e:
+            error = f"error:{type(e).__name__}"
+        on_result(host, addresses, ttl, error)
+
+
+def cache_row(host, addresses, ttl, error, config):
+    addresses = [ip_literal(address) for address in addresses]
+    addresses = sorted(
+        {address for address in addresses if address},
+        key=lambda address: (":" in address, address),
+    )
+    if error or not addresses:
+        ttl = config["negative_ttl"]
+    else:
+        ttl = min(max(ttl or config["ttl"], config["min_ttl"]), config["max_ttl"])
+    return (
+        host,
+        json.dumps(addresses),
+        addresses[0] if addresses else None,
+        error or (None if addresses else "nodata"),
+        f"+{int(ttl)} seconds",
+    )
+
+
+def save_dns_results(ctx, rows):
+    if not rows:
+        return 0
+    with ctx.database_map["get_db_connection"](ctx.configs_map["DB_PATH"]) as conn:
+        conn.executemany(DNS_UPSERT_SQL, rows)
+    return len(rows)
@@ -0,0 +1,140 @@
+import gzip
+import json
+import os
+import time
+
+
+def archive_uris(ctx):
+    retention = ctx.configs_map["RETENTION"]
+    for table_name, policy in retention["tables"].items():
+        ctx.ensure_table(table_name)
+        archived, segments = archive_table(ctx, table_name, policy)
+        print(
+            f"Archive complete → {archived} rows from {table_name} "
+            f"moved into {len(segments)} segments"
+        )
+    return None
+
+
+def archive_table(ctx, table_name, policy):
+    db_path = ctx.configs_map["DB_PATH"]
+    table_dir = os.path.join(ctx.configs_map["RETENTION"]["archive_dir"], table_name)
+    where_clause = "updated_at < ?"
+    if policy.get("where"):
+        where_clause += f" AND {policy['where']}"
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    segments = {}
+    archived = 0
+    conn = ctx.database_map["get_db_connection"](db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        cutoff = conn.execute(
+            "SELECT datetime('now', ?)", (f"-{policy['days']} days",)
+        ).fetchone()[0]
+        cur = conn.execute(
+            f"SELECT * FROM {table_name} WHERE {where_clause}", (cutoff,)
+        )
+        for row in cur:
+            record = dict(row)
+            partition = str(record.get("updated_at") or "unknown")[:7]
+            if partition not in segments:
+                segments[partition] = open_segment(table_dir, partition, stamp)
+            segments[partition][1].write(json.dumps(record, ensure_ascii=False) + "\n")
+            archived += 1
+        paths = [close_segment(*segment) for segment in segments.values()]
+        if archived:
+            conn.execute(f"DELETE FROM {table_name} WHERE {where_clause}", (cutoff,))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        for temp_path, handle, final_path in segments.values():
+            handle.close()
+            for path in (temp_path, final_path):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+        raise
+    finally:
+        conn.close()
+    return archived, paths
+
+
+def open_segment(table_dir, partition, stamp):
+    partition_dir = os.path.join(table_dir, partition)
+    os.makedirs(partition_dir, exist_ok=True)
+    final_path = os.path.join(partition_dir, f"{stamp}.jsonl.gz")
+    suffix = 1
+    while os.path.exists(final_path):
+        final_path = os.path.join(partition_dir, f"{stamp}-{suffix}.jsonl.gz")
+        suffix += 1
+    temp_path = final_path + ".tmp"
+    handle = gzip.open(temp_path, "wt", encoding="utf-8")
+    return temp_path, handle, final_path
+
+
+def close_segment(temp_path, handle, final_path):
+    handle.close()
+    with open(temp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(temp_path, final_path)
+    return final_path
+
+
+def rehydrate_uris(ctx, partition=""):
+    retention = ctx.configs_map["RETENTION"]
+    batch_size = retention["batch_size"]
+    for table_name in retention["tables"]:
+        ctx.ensure_table(table_name)
+        restored = 0
+        for segment_path in list_segments(retention["archive_dir"], table_name):
+            segment_partition = os.path.basename(os.path.dirname(segment_path))
+            if not segment_partition.startswith(partition):
+                continue
+            restored += rehydrate_segment(ctx, table_name, segment_path, batch_size)
+        print(f"Rehydrate complete → {restored} rows restored into {table_name}")
+    return None
+
+
+def list_segments(archive_dir, table_name):
+    table_dir = os.path.join(archive_dir, table_name)
+    if not os.path.isdir(table_dir):
+        return []
+    paths = []
+    for partition in sorted(os.listdir(table_dir)):
+        partition_dir = os.path.join(table_dir, partition)
+        if not os.path.isdir(partition_dir):
+            continue
+        for name in sorted(os.listdir(partition_dir)):
+            if name.endswith(".jsonl.gz"):
+                paths.append(os.path.join(partition_dir, name))
+    return paths
+
+
+def rehydrate_segment(ctx, table_name, segment_path, batch_size):
+    db_path = ctx.configs_map["DB_PATH"]
+    columns = list(ctx.configs_map["TABLE_SCHEMAS"][table_name])
+    sql = (
+        f"INSERT OR IGNORE INTO {table_name} ({', '.join(columns)}) "
+        f"VALUES ({', '.join(['?'] * len(columns))})"
+    )
+    restored = 0
+    batch = []
+    with ctx.database_map["get_db_connection"](db_path) as conn:
+        cur = conn.cursor()
+        with gzip.open(segment_path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                batch.append(tuple(record.get(col) for col in columns))
+                if len(batch) >= batch_size:
+                    cur.executemany(sql, batch)
+                    restored += cur.rowcount
+                    batch.clear()
+        if batch:
+            cur.executemany(sql, batch)
+            restored += cur.rowcount
+        conn.commit()
+    os.remove(segment_path)
+    return restored
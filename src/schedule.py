@@ -0,0 +1,151 @@
+SOURCE_COLUMNS = [
+    "url",
+    "fetches",
+    "failures",
+    "bytes",
+    "seconds",
+    "uris",
+    "new_uris",
+    "rejected",
+    "new_per_mb",
+    "new_per_second",
+    "duplicate_ratio",
+    "interval",
+]
+
+SOURCE_UPSERT_SQL = f"""
+    INSERT INTO source_stats ({", ".join(SOURCE_COLUMNS)}, last_fetched_at, next_due_at)
+    VALUES ({", ".join(["?"] * len(SOURCE_COLUMNS))}, CURRENT_TIMESTAMP, datetime('now', ?))
+    ON CONFLICT(url) DO UPDATE SET
+        {", ".join(f"{col} = excluded.{col}" for col in SOURCE_COLUMNS[1:])},
+        last_fetched_at = excluded.last_fetched_at,
+        next_due_at = excluded.next_due_at,
+        updated_at = CURRENT_TIMESTAMP
+""".strip()
+
+
+def adaptive_enabled(ctx):
+    return ctx.configs_map["SCHEDULE"]["adaptive"]["enabled"]
+
+
+def load_schedule(ctx):
+    ctx.ensure_table("source_stats")
+    rows = ctx.database_map["select_iter"](
+        db_path=ctx.configs_map["DB_PATH"],
+        table_name="source_stats",
+        columns=[
+            *SOURCE_COLUMNS,
+            "(julianday(next_due_at) - julianday('now')) * 86400 AS due_in",
+        ],
+        row_type="row",
+    )
+    return {row["url"]: dict(row) for row in rows}
+
+
+def scheduled_links(ctx, links=None):
+    if links is not None:
+        return links
+    links = ctx.configs_map["LINKS"]
+    if not adaptive_enabled(ctx):
+        return links
+    schedule = load_schedule(ctx)
+    due = [url for url in links if source_delay(schedule, url) <= 0]
+    ctx.metrics.incr("schedule.sources_due", len(due))
+    ctx.metrics.incr("schedule.sources_skipped", len(links) - len(due))
+    if len(due) < len(links):
+        print(f"Schedule → {len(due)} of {len(links)} sources due, skipping the rest")
+    return due
+
+
+def source_delay(schedule, url):
+    row = schedule.get(url)
+    if row is None or row["due_in"] is None:
+        return 0.0
+    return row["due_in"]
+
+
+def static_interval(url, schedule):
+    return schedule["intervals"].get(url, schedule["default_interval"])
+
+
+def next_interval(url, previous, sample, ctx):
+    schedule = ctx.configs_map["SCHEDULE"]
+    config = schedule["adaptive"]
+    interval = previous["interval"] if previous else None
+    if interval is None:
+        interval = static_interval(url, schedule)
+    if sample is not None and productive(sample, config):
+        interval *= config["speedup"]
+    else:
+        interval += config["backoff"]
+    return int(min(max(interval, config["min_interval"]), config["max_interval"]))
+
+
+def productive(sample, config):
+    return (
+        sample["new_uris"] >= config["min_new_uris"]
+        and sample["new_per_mb"] >= config["min_new_per_mb"]
+        and sample["duplicate_ratio"] <= config["max_duplicate_ratio"]
+    )
+
+
+def smoothed_sample(previous, sample, smoothing):
+    mib = max(sample["bytes"], 1) / 1_048_576
+    parsed = sample["uris"]
+    current = {
+        "new_per_mb": sample["new_uris"] / mib,
+        "new_per_second": sample["new_uris"] / max(sample["seconds"], 0.001),
+        "duplicate_ratio": (parsed - sample["new_uris"]) / parsed if parsed else 1.0,
+    }
+    for name, value in current.items():
+        if previous and previous[name] is not None:
+            value = smoothing * value + (1 - smoothing) * previous[name]
+        sample[name] = value
+    return sample
+
+
+def record_source(ctx, writer, schedule, url, sample):
+    config = ctx.configs_map["SCHEDULE"]["adaptive"]
+    previous = schedule.get(url)
+    if sample is not None:
+        sample = smoothed_sample(previous, dict(sample), config["smoothing"])
+        stats = sample
+    else:
+        stats = previous or {}
+    interval = next_interval(url, previous, sample, ctx)
+    row = {
+        "url": url,
+        "fetches": (previous["fetches"] if previous else 0) + 1,
+        "failures": (previous["failures"] if previous else 0) + (sample is None),
+        **{column: stats.get(column) for column in SOURCE_COLUMNS[3:-1]},
+        "interval": interval,
+    }
+    schedule[url] = {**row, "due_in": interval}
+    writer.submit(
+        "source_stats",
+        SOURCE_UPSERT_SQL,
+        [(*(row[column] for column in SOURCE_COLUMNS), f"+{interval} seconds")],
+    )
+    ctx.metrics.incr("schedule.sources_recorded")
+    return interval
+
+
+def report_schedule(ctx, schedule, urls):
+    limit = ctx.configs_map["SCHEDULE"]["adaptive"]["report_limit"]
+    rows = sorted(
+        (schedule[url] for url in urls if url in schedule),
+        key=lambda row: row["new_per_mb"] or 0,
+        reverse=True,
+    )
+    if not rows:
+        return
+    print(f"   → source yield (top {min(limit, len(rows))} of {len(rows)}):")
+    for row in rows[:limit]:
+        if row["new_per_mb"] is None:
+            print(f"      {'no data':>17} {row['failures']:>6} failed  {row['url']}")
+            continue
+        print(
+            f"      {row['new_per_mb'] or 0:>9.1f} new/MiB "
+            f"{(row['duplicate_ratio'] or 0):>6.1%} dup  "
+            f"every {row['interval'] / 3600:>6.2f}h  {row['url']}"
+        )
@@ -0,0 +1,83 @@
+import signal
+import threading
+import time
+
+from pipeline import run_fused
+from load import load_uris
+from publish import publish_uris
+from enrich import enrich_uris
+from resolve import resolve_uris
+from schedule import adaptive_enabled, load_schedule, source_delay, static_interval
+
+
+def serve(ctx):
+    schedule = ctx.configs_map["SCHEDULE"]
+    links = ctx.configs_map["LINKS"]
+    stop = threading.Event()
+    install_signal_handlers(stop)
+    next_due = source_due_times(ctx, links, time.monotonic(), initial=True)
+    cycles = 0
+    print(f"Serving {len(links)} sources, press Ctrl+C or send SIGTERM to stop.")
+    while not stop.is_set():
+        now = time.monotonic()
+        due = [url for url, due_at in next_due.items() if due_at <= now]
+        if due:
+            cycles += 1
+            run_cycle(ctx, due, cycles)
+            next_due.update(source_due_times(ctx, due, time.monotonic()))
+        wait = min(next_due.values()) - time.monotonic()
+        if wait > 0:
+            stop.wait(min(wait, schedule["max_sleep"]))
+    print(f"Stopping after {cycles} cycles.")
+    return None
+
+
+def run_cycle(ctx, urls, cycle):
+    started = time.monotonic()
+    print(f"[cycle {cycle}] Fetching and transforming {len(urls)} due sources...")
+    metrics = ctx.metrics
+    try:
+        with metrics.span("serve.fused"):
+            run_fused(ctx, urls)
+        print(f"[cycle {cycle}] Loading transformed proxies...")
+        with metrics.span("serve.load"):
+            load_uris(ctx)
+        with metrics.span("serve.resolve"):
+            resolve_uris(ctx)
+        with metrics.span("serve.enrich"):
+            enrich_uris(ctx)
+        with metrics.span("serve.publish"):
+            publish_uris(ctx)
+        if ctx.db_mode == "memory":
+            with metrics.span("serve.persist"):
+                ctx.persist()
+        metrics.incr("serve.cycles")
+    except Exception as e:
+        metrics.incr("serve.cycles_failed")
+        print(f"[cycle {cycle}] Failed: {e}")
+    print(f"[cycle {cycle}] Done in {time.monotonic() - started:.1f}s")
+
+
+def source_due_times(ctx, urls, now, initial=False):
+    schedule = ctx.configs_map["SCHEDULE"]
+    if not adaptive_enabled(ctx):
+        if initial:
+            return {url: now for url in urls}
+        return {url: now + static_interval(url, schedule) for url in urls}
+    stats = load_schedule(ctx)
+    due_times = {}
+    for url in urls:
+        delay = source_delay(stats, url)
+        if delay <= 0 and not initial:
+            delay = static_interval(url, schedule)
+        due_times[url] = now + max(delay, 0)
+    return due_times
+
+
+def install_signal_handlers(stop):
+    def handle(signum, frame):
+        print(f"Received signal {signum}, finishing current cycle...")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, handle)
+    signal.signal(signal.SIGINT, handle)
@@ -1,72 +1,609 @@
+import heapq
 import json
+import os
 import re
 import hashlib
+import textwrap
+import time
+
+FINGERPRINT_SECTIONS = {
+    "protocol": ("PROTOCOLS", None),
+    "security": ("SECURITIES", "none"),
+    "transport": ("TRANSPORTS", "raw"),
+}
+SCHEME_SQL = "substr(uri, 1, instr(uri, '://') - 1)"
+RAW_COLUMNS = ["uri", "processed", "hash", "protocol_fp", "security_fp", "transport_fp"]
+FINGERPRINT_INSERT_SQL = (
+    "INSERT OR IGNORE INTO config_fingerprints "
+    "(fingerprint, section, name) VALUES (?, ?, ?)"
+)
 
 
-def transform_uris(ctx):
+def transform_uris(ctx, time_budget=None, max_rows=None):
     uris_transform_path = ctx.configs_map["URIS_TRANSFORM_PATH"]
-    protocols_object = ctx.configs_map["PROXIES"]["PROTOCOLS"]
+    settings = ctx.configs_map["TRANSFORM"]
+    if time_budget is None:
+        time_budget = settings["time_budget"]
+    if max_rows is None:
+        max_rows = settings["max_rows"]
+    ctx.ensure_table("uris_transformed")
+    ctx.ensure_table("pipeline_state")
+    requeued = requeue_changed(ctx)
+    sync_collapsed(ctx)
+    run_id, cursor = open_checkpoint(ctx, restart=requeued > 0)
+    ordered = priority_order(ctx)
+    if cursor and ordered is None:
+        print(f"Resuming interrupted transform after row {cursor}")
+    seen_hashes = run_hashes(ctx, run_id)
+    totals = {"loaded": 0, "processed": 0, "hashed": 0, "invalid": 0}
+    started = time.monotonic()
+    stopped = None
+    for page in backlog_pages(ctx, ordered, cursor, max_rows):
+        chunk_started = time.monotonic()
+        batch = transform_batch((uri for _, uri in page), ctx, seen_hashes)
+        if ordered is None:
+            cursor = page[-1][0]
+        with ctx.metrics.span("transform.checkpoint"):
+            write_chunk(ctx, batch, run_id, cursor)
+        ctx.metrics.incr("transform.chunks")
+        totals["loaded"] += batch["loaded"]
+        totals["processed"] += len(batch["uri_to_processed"])
+        totals["hashed"] += len(batch["uri_to_hash"])
+        totals["invalid"] += batch["invalid_addresses"]
+        now = time.monotonic()
+        if time_budget and now + (now - chunk_started) - started > time_budget:
+            stopped = f"time budget of {time_budget}s"
+            break
+    if stopped is None and max_rows is not None and totals["loaded"] >= max_rows:
+        stopped = f"row limit of {max_rows}"
+    print(f"Loaded {totals['loaded']} unprocessed URIs from database.")
+    with ctx.metrics.span("transform.write"):
+        unique = export_transformed(ctx, run_id, uris_transform_path)
+    close_checkpoint(ctx)
+    report_collapsed(ctx)
+    report_transform(
+        totals["loaded"],
+        unique,
+        totals["processed"],
+        totals["hashed"],
+        totals["invalid"],
+    )
+    report_rejections(ctx)
+    report_backlog(ctx, stopped)
+
+
+def priority_order(ctx):
+    priority = ctx.configs_map["TRANSFORM"]["priority"]
+    terms = []
+    params = []
+    for column, favoured in [
+        ("source", priority["sources"]),
+        (SCHEME_SQL, priority["protocols"]),
+    ]:
+        if favoured:
+            cases = " ".join(f"WHEN ? THEN {rank}" for rank in range(len(favoured)))
+            terms.append(f"CASE {column} {cases} ELSE {len(favoured)} END")
+            params.extend(favoured)
+    if priority["order"] == "newest":
+        terms.append("rowid DESC")
+    elif not terms:
+        return None
+    else:
+        terms.append("rowid")
+    return ", ".join(terms), params
+
+
+def backlog_pages(ctx, ordered, cursor, max_rows):
     db_path = ctx.configs_map["DB_PATH"]
-    raw_records = ctx.database_map["select_all"](
-        db_path=db_path, table_name="uris_raw", where_clause="processed = 0", params=()
+    chunk_size = ctx.configs_map["TRANSFORM"]["chunk_size"]
+    if ordered is None:
+        pages = ctx.database_map["select_pages"](
+            db_path=db_path,
+            table_name="uris_raw",
+            columns=["uri"],
+            where_clause="processed = 0",
+            page_size=chunk_size,
+            after_rowid=cursor,
+        )
+        remaining = max_rows
+        for page in pages:
+            if remaining is not None:
+                page = page[:remaining]
+                remaining -= len(page)
+            if page:
+                yield page
+            if remaining is not None and remaining <= 0:
+                return
+        return
+    order_by, params = ordered
+    with ctx.database_map["get_db_connection"](db_path) as conn:
+        rowids = [
+            row[0]
+            for row in conn.execute(
+                f"SELECT rowid FROM uris_raw WHERE processed = 0 "
+                f"ORDER BY {order_by} LIMIT ?",
+                (*params, -1 if max_rows is None else max_rows),
+            )
+        ]
+    for start in range(0, len(rowids), chunk_size):
+        chunk = rowids[start : start + chunk_size]
+        placeholders = ", ".join(["?"] * len(chunk))
+        with ctx.database_map["get_db_connection"](db_path) as conn:
+            uris = dict(
+                conn.execute(
+                    f"SELECT rowid, uri FROM uris_raw WHERE rowid IN ({placeholders}) "
+                    "AND processed = 0",
+                    chunk,
+                ).fetchall()
+            )
+        page = [(rowid, uris[rowid]) for rowid in chunk if rowid in uris]
+        if page:
+            yield page
+
+
+def open_checkpoint(ctx, restart=False):
+    with ctx.database_map["get_db_connection"](ctx.configs_map["DB_PATH"]) as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO pipeline_state (name, cursor, started_at) "
+            "VALUES ('transform', 0, CURRENT_TIMESTAMP)"
+        )
+        if restart:
+            conn.execute(
+                "UPDATE pipeline_state SET cursor = 0 WHERE name = 'transform'"
+            )
+        conn.commit()
+        row = conn.execute(
+            "SELECT id, cursor FROM pipeline_state WHERE name = 'transform'"
+        ).fetchone()
+    return row[0], row[1]
+
+
+def run_hashes(ctx, run_id):
+    rows = ctx.database_map["select_iter"](
+        db_path=ctx.configs_map["DB_PATH"],
+        table_name="uris_transformed",
+        columns=["hash"],
+        where_clause="run_id = ?",
+        params=(run_id,),
+    )
+    return {hash_val for (hash_val,) in rows}
+
+
+def close_checkpoint(ctx):
+    with ctx.database_map["get_db_connection"](ctx.configs_map["DB_PATH"]) as conn:
+        conn.execute("DELETE FROM pipeline_state WHERE name = 'transform'")
+        conn.commit()
+
+
+def write_chunk(ctx, batch, run_id, cursor):
+    with ctx.database_map["get_db_connection"](ctx.configs_map["DB_PATH"]) as conn:
+        write_batch(conn, ctx, batch, run_id)
+        conn.execute(
+            "UPDATE pipeline_state SET cursor = ?, updated_at = CURRENT_TIMESTAMP "
+            "WHERE name = 'transform'",
+            (cursor,),
+        )
+        conn.commit()
+
+
+def write_batch(conn, ctx, batch, run_id, source=None):
+    to_record = ctx.processors_map["proxy_to_record"]
+    build_upsert_sql = ctx.database_map["build_upsert_sql"]
+    uri_to_hash = batch["uri_to_hash"]
+    uri_to_fingerprint = batch["uri_to_fingerprint"]
+    records = [{**to_record(obj), "run_id": run_id} for obj in batch["objects"]]
+    raw_columns = RAW_COLUMNS if source is None else [*RAW_COLUMNS, "source"]
+    raw_rows = [
+        (uri, 1, uri_to_hash.get(uri), *uri_to_fingerprint.get(uri, (None, None, None)))
+        + (() if source is None else (source,))
+        for uri in batch["uri_to_processed"]
+    ]
+    if records:
+        columns = list(records[0])
+        conn.executemany(
+            build_upsert_sql(
+                "uris_transformed", columns, "hash", touch_columns=["updated_at"]
+            ),
+            [tuple(record[column] for column in columns) for record in records],
+        )
+        refresh_collapsed(conn, ctx, {record["address"] for record in records})
+    if raw_rows:
+        conn.executemany(build_upsert_sql("uris_raw", raw_columns, "uri"), raw_rows)
+    conn.executemany(
+        FINGERPRINT_INSERT_SQL,
+        [(fp, section, name) for (section, name), fp in batch["fingerprints"].items()],
     )
-    uris = [row["uri"] for row in raw_records]
-    print(f"Loaded {len(uris)} unprocessed URIs from database.")
+    return len(records)
+
+
+def export_transformed(ctx, run_id, path):
+    rows = ctx.database_map["select_iter"](
+        db_path=ctx.configs_map["DB_PATH"],
+        table_name="uris_transformed",
+        columns=["proxy_object"],
+        where_clause="run_id = ? AND collapsed = 0",
+        params=(run_id,),
+        order_by="hash",
+    )
+    tmp_path = f"{path}.tmp"
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for (proxy_object,) in rows:
+            f.write(",\n" if count else "\n")
+            f.write(
+                textwrap.indent(
+                    json.dumps(json.loads(proxy_object), indent=2, ensure_ascii=False),
+                    "  ",
+                )
+            )
+            count += 1
+        f.write("\n]" if count else "]")
+    os.replace(tmp_path, path)
+    print(f"Saved JSON with {count} processed URIs to {path}.")
+    return count
+
+
+def sync_collapsed(ctx):
+    dedup = ctx.configs_map["DEDUP"]
+    encoded = json.dumps(dedup, sort_keys=True)
+    name = "collapse:" + hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+    ctx.ensure_table("uris_transformed")
+    ctx.ensure_table("pipeline_state")
+    ctx.ensure_table("dns_cache")
+    with ctx.database_map["get_db_connection"](ctx.configs_map["DB_PATH"]) as conn:
+        if conn.execute(
+            "SELECT 1 FROM pipeline_state WHERE name = ?", (name,)
+        ).fetchone():
+            return 0
+        changed = refresh_collapsed(conn, ctx)
+        conn.execute("DELETE FROM pipeline_state WHERE name LIKE 'collapse:%'")
+        conn.execute("INSERT INTO pipeline_state (name) VALUES (?)", (name,))
+        conn.commit()
+    print(
+        f"Endpoint dedup ({dedup['policy']}, up to {dedup['max_variants']} "
+        f"per endpoint) → recomputed for the whole table, {changed} flags changed"
+    )
+    return changed
+
+
+def refresh_collapsed(conn, ctx, addresses=None):
+    resolved = {}
+    if ctx.configs_map["DEDUP"]["resolve_addresses"]:
+        resolved = resolved_hosts(conn, addresses)
+    if addresses is None:
+        keep = collapse_plan(
+            (
+                json.loads(proxy_object)
+                for (proxy_object,) in conn.execute(
+                    "SELECT proxy_object FROM uris_transformed ORDER BY rowid"
+                )
+            ),
+            resolved,
+            ctx,
+        )
+        rows = conn.execute(
+            "SELECT rowid, collapsed FROM uris_transformed ORDER BY rowid"
+        ).fetchall()
+    else:
+        rows = endpoint_rows(conn, addresses, resolved)
+        keep = collapse_plan(
+            [json.loads(proxy_object) for _, _, proxy_object in rows], resolved, ctx
+        )
+    changes = []
+    for position, (rowid, collapsed, *_) in enumerate(rows):
+        flag = int(keep is not None and position not in keep)
+        if flag != (collapsed or 0):
+            changes.append((flag, rowid))
+    conn.executemany(
+        "UPDATE uris_transformed SET collapsed = ? WHERE rowid = ?", changes
+    )
+    ctx.metrics.incr("transform.collapse_flags_changed", len(changes))
+    return len(changes)
+
+
+def resolved_hosts(conn, addresses=None):
+    sql = "SELECT host, resolved_ip FROM dns_cache WHERE resolved_ip IS NOT NULL"
+    if addresses is None:
+        return dict(conn.execute(sql))
+    resolved = dict(rows_matching(conn, sql + " AND host IN ({})", addresses))
+    targets = {resolved.get(address, address) for address in addresses}
+    resolved.update(rows_matching(conn, sql + " AND resolved_ip IN ({})", targets))
+    return resolved
+
+
+def endpoint_rows(conn, addresses, resolved):
+    targets = {resolved.get(address, address) for address in addresses}
+    candidates = {address for address in addresses if address is not None}
+    candidates.update(target for target in targets if target is not None)
+    candidates.update(host for host, ip in resolved.items() if ip in targets)
+    sql = "SELECT rowid, collapsed, proxy_object FROM uris_transformed"
+    rows = list(rows_matching(conn, sql + " WHERE address IN ({})", candidates))
+    if None in addresses:
+        rows.extend(conn.execute(sql + " WHERE address IS NULL"))
+    return sorted(rows, key=lambda row: row[0])
+
+
+def rows_matching(conn, sql, values, chunk_size=500):
+    values = [value for value in values if value is not None]
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start : start + chunk_size]
+        yield from conn.execute(sql.format(", ".join(["?"] * len(chunk))), chunk)
+
+
+def transform_batch(uris, ctx, seen_hashes):
+    protocols_object = ctx.configs_map["PROXIES"]["PROTOCOLS"]
+    loaded = 0
     processed_objects = []
-    seen_hashes = set()
     uri_to_hash = {}
     uri_to_processed = {}
-    for uri in uris:
-        if "://" not in uri:
+    uri_to_fingerprint = {}
+    fingerprints = {}
+    candidates = []
+    failed = 0
+    metrics = ctx.metrics
+    with metrics.span("transform.parse"):
+        for uri in uris:
+            loaded += 1
+            if "://" not in uri:
+                uri_to_processed[uri] = 1
+                failed += 1
+                metrics.reject("unknown", "parse", uri, "no_scheme")
+                continue
+            protocol_key = uri.split("://")[0]
+            protocol_fp = config_fingerprint(
+                ctx, "protocol", protocol_key, fingerprints
+            )
+            if protocol_key not in protocols_object:
+                uri_to_processed[uri] = 1
+                uri_to_fingerprint[uri] = (protocol_fp, None, None)
+                failed += 1
+                metrics.reject("unknown", "parse", uri, "unsupported_scheme")
+                continue
+            proxy_object = process_protocol(
+                uri,
+                protocol_key,
+                protocols_object[protocol_key],
+                ctx,
+            )
+            uri_to_fingerprint[uri] = request_fingerprints(
+                proxy_object, protocol_fp, ctx, fingerprints
+            )
+            stage = "parse"
+            if proxy_object:
+                stage = "security"
+                proxy_object = process_security(proxy_object, ctx)
+            if proxy_object:
+                stage = "transport"
+                proxy_object = process_transport(proxy_object, ctx)
+            if not proxy_object:
+                uri_to_processed[uri] = 1
+                failed += 1
+                metrics.reject(protocol_key, stage, uri)
+                continue
+            proxy_object.pop("params", None)
+            candidates.append((uri, proxy_object))
+    invalid_addresses = 0
+    with metrics.span("transform.validate_hash"):
+        for uri, proxy_object in validate_addresses(candidates, protocols_object, ctx):
+            if proxy_object is None:
+                uri_to_processed[uri] = 1
+                invalid_addresses += 1
+                metrics.reject(uri.split("://")[0], "address", uri, "invalid")
+                continue
+            hash_val = compute_hash(proxy_object, ctx)
+            proxy_object["hash"] = hash_val
             uri_to_processed[uri] = 1
-            continue
-        protocol_key = uri.split("://")[0]
-        if protocol_key not in protocols_object:
-            uri_to_processed[uri] = 1
-            continue
-        proxy_object = process_protocol(
-            uri,
-            protocol_key,
-            protocols_object[protocol_key],
-            ctx,
+            if hash_val not in seen_hashes:
+                seen_hashes.add(hash_val)
+                processed_objects.append(proxy_object)
+                uri_to_hash[uri] = hash_val
+            else:
+                uri_to_processed[uri] = 1
+    metrics.incr("transform.uris_loaded", loaded)
+    metrics.incr("transform.uris_failed", failed)
+    metrics.incr("transform.uris_invalid_address", invalid_addresses)
+    metrics.incr(
+        "transform.uris_deduped", len(candidates) - invalid_addresses - len(uri_to_hash)
+    )
+    metrics.incr("transform.configs_unique", len(processed_objects))
+    return {
+        "loaded": loaded,
+        "objects": processed_objects,
+        "uri_to_processed": uri_to_processed,
+        "uri_to_hash": uri_to_hash,
+        "uri_to_fingerprint": uri_to_fingerprint,
+        "fingerprints": fingerprints,
+        "invalid_addresses": invalid_addresses,
+    }
+
+
+def config_fingerprint(ctx, section, name, cache):
+    key = (section, name)
+    if key not in cache:
+        config_key, fallback = FINGERPRINT_SECTIONS[section]
+        entries = ctx.configs_map["PROXIES"][config_key]
+        payload = [section, name, entries.get(name)]
+        if name not in entries and fallback is not None:
+            payload.append(entries.get(fallback))
+        encoded = json.dumps(payload, sort_keys=True, default=sorted)
+        cache[key] = hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+    return cache[key]
+
+
+def request_fingerprints(proxy_object, protocol_fp, ctx, cache):
+    if not proxy_object or "security" not in proxy_object:
+        return (protocol_fp, None, None)
+    params = proxy_object.get("params", {})
+    security = str(params.get("security", "")).strip().lower()
+    transport = str(params.get("type", "")).strip().lower()
+    return (
+        protocol_fp,
+        config_fingerprint(ctx, "security", security, cache),
+        config_fingerprint(ctx, "transport", transport, cache),
+    )
+
+
+def requeue_changed(ctx, batch_size=5000):
+    ctx.ensure_table("uris_raw")
+    ctx.ensure_table("config_fingerprints")
+    cache = {}
+    changed = []
+    requeued = 0
+    with ctx.database_map["get_db_connection"](ctx.configs_map["DB_PATH"]) as conn:
+        stored = conn.execute(
+            "SELECT fingerprint, section, name FROM config_fingerprints"
+        ).fetchall()
+        targets = []
+        if not stored:
+            targets.append(("protocol_fp IS NULL", ()))
+        for fingerprint, section, name in stored:
+            if config_fingerprint(ctx, section, name, cache) != fingerprint:
+                changed.append((fingerprint, f"{section}:{name}"))
+                targets.append((f"{section}_fp = ?", (fingerprint,)))
+        for condition, params in targets:
+            while True:
+                cur = conn.execute(
+                    "UPDATE uris_raw SET processed = 0 WHERE rowid IN ("
+                    f"SELECT rowid FROM uris_raw WHERE {condition} AND processed = 1 "
+                    "LIMIT ?)",
+                    (*params, batch_size),
+                )
+                conn.commit()
+                requeued += cur.rowcount
+                if cur.rowcount < batch_size:
+                    break
+        conn.executemany(
+            "DELETE FROM config_fingerprints WHERE fingerprint = ?",
+            [(fingerprint,) for fingerprint, _ in changed],
         )
-        proxy_object = process_security(proxy_object, ctx)
-        proxy_object = process_transport(proxy_object, ctx)
-        if not proxy_object:
-            uri_to_processed[uri] = 1
-            continue
-        proxy_object.pop("params", None)
-        hash_val = compute_hash(proxy_object, ctx)
-        proxy_object["hash"] = hash_val
-        uri_to_processed[uri] = 1
-        if hash_val not in seen_hashes:
-            seen_hashes.add(hash_val)
-            processed_objects.append(proxy_object)
-            uri_to_hash[uri] = hash_val
+        conn.commit()
+    ctx.metrics.incr("transform.uris_requeued", requeued)
+    if changed:
+        names = ", ".join(sorted(name for _, name in changed))
+        print(f"Config changed for {names} → requeued {requeued} URIs")
+    elif requeued:
+        print(f"Requeued {requeued} URIs transformed before fingerprinting")
+    return requeued
+
+
+def endpoint_key(proxy_object, resolved):
+    protocol = proxy_object["protocol"]
+    address = protocol.get("address")
+    return (
+        resolved.get(address, address),
+        protocol.get("port"),
+        protocol.get("id") or protocol.get("password"),
+        proxy_object.get("security", {}).get("type"),
+        proxy_object.get("transport", {}).get("type"),
+    )
+
+
+def completeness(value):
+    if isinstance(value, dict):
+        return sum(completeness(v) for v in value.values())
+    if isinstance(value, list):
+        return 1 if value else 0
+    return 0 if value in (None, "") else 1
+
+
+def collapse_plan(objects, resolved, ctx):
+    policy = ctx.configs_map["DEDUP"]["policy"]
+    max_variants = ctx.configs_map["DEDUP"]["max_variants"]
+    if policy == "none":
+        return None
+    groups = {}
+    total = 0
+    with ctx.metrics.span("transform.collapse"):
+        for position, proxy_object in enumerate(objects):
+            total += 1
+            group = groups.setdefault(endpoint_key(proxy_object, resolved), [])
+            if policy == "first":
+                if len(group) < max_variants:
+                    group.append(position)
+                continue
+            entry = (completeness(proxy_object), -position)
+            if len(group) < max_variants:
+                heapq.heappush(group, entry)
+            elif entry > group[0]:
+                heapq.heapreplace(group, entry)
+        if policy == "first":
+            keep = {position for group in groups.values() for position in group}
         else:
-            uri_to_processed[uri] = 1
-    ctx.processors_map["write_json_file"](processed_objects, uris_transform_path)
-    if uri_to_processed:
-        ctx.database_map["bulk_upsert"](
-            db_path=db_path,
-            table_name="uris_raw",
-            records=[{"uri": uri, "processed": 1} for uri in uri_to_processed.keys()],
-            key_columns="uri",
-        )
-    if uri_to_hash:
-        ctx.database_map["bulk_upsert"](
-            db_path=db_path,
-            table_name="uris_raw",
-            records=[
-                {"uri": uri, "processed": 1, "hash": h}
-                for uri, h in uri_to_hash.items()
-            ],
-            key_columns="uri",
-        )
-    print(f"   → {len(processed_objects)} unique configs saved to JSON")
-    print(f"   → {len(uri_to_processed)} URIs marked as processed")
-    print(f"   → {len(uri_to_hash)} URIs got a unique hash")
-    print(f"   → {len(uris) - len(uri_to_processed)} failed/skipped")
+            keep = {-entry[1] for group in groups.values() for entry in group}
+    ctx.metrics.incr("transform.endpoints", len(groups))
+    ctx.metrics.incr("transform.configs_collapsed", total - len(keep))
+    return keep
+
+
+def report_collapsed(ctx):
+    dedup = ctx.configs_map["DEDUP"]
+    if dedup["policy"] == "none":
+        return
+    with ctx.database_map["get_db_connection"](ctx.configs_map["DB_PATH"]) as conn:
+        total, kept = conn.execute(
+            "SELECT COUNT(*), COUNT(*) - COALESCE(SUM(collapsed), 0) "
+            "FROM uris_transformed"
+        ).fetchone()
+    if not total:
+        return
+    print(
+        f"Endpoint dedup ({dedup['policy']}, up to {dedup['max_variants']} per "
+        f"endpoint) → {total} → {kept} configs, {(total - kept) / total:.1%} smaller"
+    )
+
+
+def report_transform(loaded, unique, processed, hashed, invalid_addresses):
+    print(f"   → {unique} unique configs saved to JSON")
+    print(f"   → {processed} URIs marked as processed")
+    print(f"   → {hashed} URIs got a unique hash")
+    print(f"   → {invalid_addresses} URIs rejected for an invalid address")
+    print(f"   → {loaded - processed} failed/skipped")
+
+
+def report_rejections(ctx):
+    limit = ctx.configs_map["TRANSFORM"]["rejection_report_limit"]
+    rejections = ctx.metrics.rejections()
+    if not rejections:
+        return
+    print(f"   → top rejection reasons ({len(rejections)} kinds):")
+    for count, (protocol, stage, reason) in rejections[:limit]:
+        print(f"      {count:>8}  {protocol:<10} {stage:<10} {reason}")
+
+
+def report_backlog(ctx, stopped):
+    limit = ctx.configs_map["TRANSFORM"]["backlog_report_limit"]
+    with ctx.database_map["get_db_connection"](ctx.configs_map["DB_PATH"]) as conn:
+        rows = conn.execute(
+            f"SELECT {SCHEME_SQL} AS scheme, COUNT(*) FROM uris_raw "
+            "WHERE processed = 0 GROUP BY scheme ORDER BY COUNT(*) DESC"
+        ).fetchall()
+    remaining = sum(count for _, count in rows)
+    ctx.metrics.counters["transform.backlog_remaining"] = remaining
+    if not remaining:
+        return
+    if stopped:
+        print(f"   → stopped at the {stopped}")
+    details = ", ".join(f"{scheme or '?'}: {count}" for scheme, count in rows[:limit])
+    print(f"   → {remaining} URIs left in the backlog ({details})")
+
+
+def validate_addresses(candidates, protocols_object, ctx):
+    groups = {}
+    for index, (_, proxy_object) in enumerate(candidates):
+        protocol_key = proxy_object["protocol"]["type"]
+        validators = protocols_object[protocol_key]["address"].get("validators", [])
+        groups.setdefault(tuple(validators), []).append(index)
+    valid = [True] * len(candidates)
+    for validators, indexes in groups.items():
+        if not validators:
+            continue
+        addresses = [candidates[i][1]["protocol"]["address"] for i in indexes]
+        mask, _ = ctx.batch_map["validate_batch"](validators, addresses)
+        for i, ok in zip(indexes, mask):
+            valid[i] = ok
+    for (uri, proxy_object), ok in zip(candidates, valid):
+        yield uri, (proxy_object if ok else None)
 
 
 def process_protocol(uri, protocol_key, protocol_values, ctx):
@@ -74,14 +611,14 @@ def process_protocol(uri, protocol_key, protocol_values, ctx):
     if parser:
         return parser(uri, protocol_values, ctx)
     else:
-        return None
+        return rejected(ctx, "no_parser")
 
 
 def parse_vless_uri(uri, protocol_values, ctx):
     pattern = r"vless://([^@]+)@([^:]+):(\d+)(?:\?([^#]*))?(?:#(.*))?$"
     match = re.match(pattern, uri)
     if not match:
-        return None
+        return rejected(ctx, "pattern")
     id_raw = match.group(1)
     address_raw = match.group(2)
     port_raw = match.group(3)
@@ -114,7 +651,7 @@ def parse_trojan_uri(uri, protocol_values, ctx):
     pattern = r"trojan://([^@]+)@([^:]+):(\d+)(?:\?([^#]*))?(?:#(.*))?$"
     match = re.match(pattern, uri)
     if not match:
-        return None
+        return rejected(ctx, "pattern")
     password_raw = match.group(1)
     address_raw = match.group(2)
     port_raw = match.group(3)
@@ -146,7 +683,7 @@ def parse_ss_uri(uri, protocol_values, ctx):
     pattern = r"ss://([A-Za-z0-9+/=]+)@([^:]+):(\d+)(?:\?([^#]*))?(?:#(.*))?$"
     match = re.match(pattern, uri)
     if not match:
-        return None
+        return rejected(ctx, "pattern")
     b64_part_raw = match.group(1)
     address_raw = match.group(2)
     port_raw = match.group(3)
@@ -156,11 +693,11 @@ def parse_ss_uri(uri, protocol_values, ctx):
     port = ctx.processors_map["to_int"](port_raw)
     b64_part_decode = ctx.processors_map["decode_b64_simple"](b64_part_raw)
     if not b64_part_decode:
-        return None
+        return rejected(ctx, "base64")
     try:
         method, password = b64_part_decode.split(":", 1)
     except ValueError:
-        return None
+        return rejected(ctx, "userinfo")
     params_protocol = ctx.processors_map["extract_params"](params, protocol_values)
     protocol_dict = {
         "type": "ss",
@@ -189,27 +726,29 @@ def parse_vmess_uri(uri, protocol_values, ctx):
     pattern_uri = r"vmess://([^@]+)@([^:]+):(\d+)(?:\?([^#]*))?(?:#(.*))?$"
     if re.match(pattern_uri, uri):
         return parse_vmess_uri_format(uri, protocol_values, ctx)
-    return None
+    return rejected(ctx, "pattern")
 
 
 def parse_vmess_b64_format(uri, protocol_values, ctx):
     pattern = r"vmess://([^#]+)$"
     match = re.match(pattern, uri)
     if not match:
-        return None
+        return rejected(ctx, "pattern")
     b64_part_raw = match.group(1)
     b64_part_decode = ctx.processors_map["decode_b64_simple"](b64_part_raw)
     if not b64_part_decode:
-        return None
+        return rejected(ctx, "base64")
     try:
         obj_data = json.loads(b64_part_decode)
     except json.JSONDecodeError:
-        return None
+        return rejected(ctx, "json")
+    if not isinstance(obj_data, dict):
+        return rejected(ctx, "json")
     address_raw = obj_data.get("add", "")
     port_raw = obj_data.get("port")
     id_raw = obj_data.get("id", "")
     if not address_raw or port_raw is None or not id_raw:
-        return None
+        return rejected(ctx, "missing:add_port_id")
     address = ctx.processors_map["to_lower"](address_raw)
     port = ctx.processors_map["to_int"](port_raw)
     uuid = ctx.processors_map["id_to_uuid"](id_raw)
@@ -238,7 +777,7 @@ def parse_vmess_uri_format(uri, protocol_values, ctx):
     pattern = r"vmess://([^@]+)@([^:]+):(\d+)(?:\?([^#]*))?(?:#(.*))?$"
     match = re.match(pattern, uri)
     if not match:
-        return None
+        return rejected(ctx, "pattern")
     id_raw = match.group(1)
     address_raw = match.group(2)
     port_raw = match.group(3)
@@ -271,7 +810,7 @@ def parse_hysteria2_uri(uri, protocol_values, ctx):
     pattern = r"hysteria2://([^@]+)@([^:]+):(\d+)(?:\?([^#]*))?(?:#(.*))?$"
     match = re.match(pattern, uri)
     if not match:
-        return None
+        return rejected(ctx, "pattern")
     password_raw = match.group(1)
     address_raw = match.group(2)
     port_raw = match.group(3)
@@ -301,6 +840,11 @@ def parse_hysteria2_uri(uri, protocol_values, ctx):
     return obj
 
 
+def rejected(ctx, reason):
+    ctx.metrics.note_rejection(reason)
+    return None
+
+
 def compute_hash(obj, ctx):
     hash_input = {k: v for k, v in obj.items()}
     hash_input = ctx.processors_map["case_insensitive_hash"](hash_input)
@@ -324,7 +868,9 @@ def process_security(proxy_object, ctx):
     security_obj = {"type": security_type}
     if security_type != "none":
         security_values = securities_object[security_type]
-        security_params = ctx.processors_map["extract_params"](params, security_values)
+        security_params = ctx.processors_map["extract_params"](
+            params, security_values, ctx.metrics.note_rejection
+        )
         if security_params is None:
             return None
         security_obj = {**security_obj, **security_params}
@@ -347,7 +893,9 @@ def process_transport(proxy_object, ctx):
         transport_type = transport_raw
     transport_obj = {"type": transport_type}
     transport_values = transports_object[transport_type]
-    tarnsport_params = ctx.processors_map["extract_params"](params, transport_values)
+    tarnsport_params = ctx.processors_map["extract_params"](
+        params, transport_values, ctx.metrics.note_rejection
+    )
     if tarnsport_params is None:
         return None
     transport_obj = {**transport_obj, **tarnsport_params}
@@ -0,0 +1,35 @@
+from context import AppContext
+from transform import transform_uris
+
+FIRST_SEEN = "trojan://pw@5.6.7.8:443?security=tls&alpn=h2#t2"
+SEEN_LATER = "trojan://pw@5.6.7.8:443?security=tls#t1"
+
+
+def queue_uris(ctx, uris):
+    ctx.ensure_table("uris_raw")
+    with ctx.database_map["get_db_connection"](ctx.configs_map["DB_PATH"]) as conn:
+        conn.executemany(
+            "INSERT INTO uris_raw (uri, processed) VALUES (?, 0)",
+            [(uri,) for uri in uris],
+        )
+
+
+def test_first_policy_keeps_first_seen_variant(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "output").mkdir()
+    (tmp_path / "data").mkdir()
+    ctx = AppContext()
+    ctx.configs_map["DEDUP"] = {**ctx.configs_map["DEDUP"], "policy": "first"}
+    for uri in (FIRST_SEEN, SEEN_LATER):
+        queue_uris(ctx, [uri])
+        transform_uris(ctx)
+    with ctx.database_map["get_db_connection"](ctx.configs_map["DB_PATH"]) as conn:
+        rows = conn.execute(
+            "SELECT r.uri, t.hash, t.collapsed FROM uris_transformed AS t "
+            "JOIN uris_raw AS r ON r.hash = t.hash ORDER BY t.rowid"
+        ).fetchall()
+    ctx.close()
+    (first_uri, first_hash, first_flag), (later_uri, later_hash, later_flag) = rows
+    assert (first_uri, later_uri) == (FIRST_SEEN, SEEN_LATER)
+    assert first_hash > later_hash
+    assert (first_flag, later_flag) == (0, 1)
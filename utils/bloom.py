@@ -0,0 +1,106 @@
+import hashlib
+import math
+import os
+import struct
+import time
+
+HEADER = struct.Struct(">4sQQIdQ")
+MAGIC = b"XBF1"
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate, created_at=None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+        self.created_at = time.time() if created_at is None else created_at
+
+    def positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def __contains__(self, item):
+        bits = self.bits
+        for position in self.positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def add(self, item):
+        bits = self.bits
+        added = False
+        for position in self.positions(item):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def estimated_error_rate(self):
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+    def age(self):
+        return time.time() - self.created_at
+
+    def stats(self):
+        return {
+            "capacity": self.capacity,
+            "entries": self.count,
+            "size_bytes": len(self.bits),
+            "hashes": self.hashes,
+            "target_error_rate": self.error_rate,
+            "estimated_error_rate": self.estimated_error_rate(),
+        }
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC,
+                    self.capacity,
+                    self.size,
+                    self.hashes,
+                    self.created_at,
+                    self.count,
+                )
+            )
+            f.write(self.bits)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, capacity, error_rate):
+        if not os.path.exists(path):
+            return cls(capacity, error_rate)
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            bits = f.read()
+        if len(header) < HEADER.size:
+            return cls(capacity, error_rate)
+        magic, _, size, hashes, created_at, count = HEADER.unpack(header)
+        bloom = cls(capacity, error_rate, created_at=created_at)
+        if magic != MAGIC or (size, hashes) != (bloom.size, bloom.hashes):
+            return cls(capacity, error_rate)
+        if len(bits) != len(bloom.bits):
+            return cls(capacity, error_rate)
+        bloom.bits = bytearray(bits)
+        bloom.count = count
+        return bloom
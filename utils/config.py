@@ -23,6 +23,132 @@ LINKS = [
 DB_PATH = "data/database.db"
 URIS_TRANSFORM_PATH = "output/uris_transform.json"
 
+WRITE_BEHIND = {
+    "max_pending_batches": 8,
+    "group_batches": 4,
+}
+
+SCHEDULE = {
+    "default_interval": 24 * 60 * 60,
+    "max_sleep": 60,
+    "intervals": {
+        "https://raw.githubusercontent.com/barry-far/V2ray-config/main/All_Configs_Sub.txt": 1800,
+        "https://raw.githubusercontent.com/Epodonios/v2ray-configs/main/All_Configs_Sub.txt": 1800,
+        "https://raw.githubusercontent.com/MrMohebi/xray-proxy-grabber-telegram/master/collected-proxies/row-url/all.txt": 1800,
+        "https://raw.githubusercontent.com/mahdibland/V2RayAggregator/master/sub/splitted/vmess.txt": 7200,
+    },
+    "adaptive": {
+        "enabled": False,
+        "min_interval": 15 * 60,
+        "max_interval": 7 * 24 * 60 * 60,
+        "min_new_uris": 10,
+        "min_new_per_mb": 50.0,
+        "max_duplicate_ratio": 0.98,
+        "speedup": 0.5,
+        "backoff": 2 * 60 * 60,
+        "smoothing": 0.3,
+        "report_limit": 10,
+    },
+}
+
+PREFILTER = {
+    "enabled": True,
+    "path": "data/known_uris.bloom",
+    "capacity": 2_000_000,
+    "error_rate": 0.001,
+    "rotate_after": 24 * 60 * 60,
+}
+
+FETCH = {
+    "sniff_bytes": 4096,
+}
+
+RECLASSIFY = {
+    "batch_size": 5000,
+}
+
+SHARDS = {
+    "dir": "data/shards",
+}
+
+TRANSFORM = {
+    "chunk_size": 5000,
+    "rejection_samples": 5,
+    "rejection_report_limit": 10,
+    "time_budget": None,
+    "max_rows": None,
+    "priority": {
+        "order": "oldest",
+        "sources": [],
+        "protocols": [],
+    },
+    "backlog_report_limit": 5,
+}
+
+DEDUP = {
+    "policy": "most_complete",
+    "max_variants": 1,
+    "resolve_addresses": True,
+}
+
+XRAY_EXPORT = {
+    "output_dir": "output/xray",
+    "chunk_size": 200,
+    "tag_prefix": "proxy-",
+    "balancer_strategy": "leastPing",
+    "probe_url": "https://www.google.com/generate_204",
+    "probe_interval": "5m",
+    "skip_protocols": ["hysteria2"],
+}
+
+PUBLISH = {
+    "output_dir": "output/publish",
+    "shard_prefix_length": 1,
+}
+
+PROBE = {
+    "concurrency": 1000,
+    "timeout": 5.0,
+    "per_host_interval": 0.2,
+    "recheck_after": 60 * 60,
+    "flush_every": 1000,
+    "tls_securities": ["tls"],
+    "skip_protocols": ["hysteria2"],
+}
+
+RESOLVE = {
+    "enabled": True,
+    "resolver": "system",
+    "concurrency": 200,
+    "timeout": 3.0,
+    "ttl": 60 * 60,
+    "min_ttl": 5 * 60,
+    "max_ttl": 24 * 60 * 60,
+    "negative_ttl": 10 * 60,
+    "flush_every": 1000,
+    "nameserver": "1.1.1.1:53",
+    "hosts": {},
+}
+
+GEOIP = {
+    "enabled": True,
+    "source_path": "data/ip2asn-combined.tsv",
+    "index_path": "data/geoip.idx",
+    "cache_size": 100_000,
+    "batch_size": 5000,
+}
+
+RETENTION = {
+    "archive_dir": "data/archive",
+    "batch_size": 5_000,
+    "tables": {
+        "uris_raw": {
+            "days": 30,
+            "where": "processed = 1",
+        },
+    },
+}
+
 PROXIES = {
     "PROTOCOLS": {
         "vless": {
@@ -385,10 +511,49 @@ TABLE_SCHEMAS = {
         "processed": "INTEGER DEFAULT 0",
         "created_at": "DATETIME DEFAULT CURRENT_TIMESTAMP",
         "updated_at": "DATETIME DEFAULT CURRENT_TIMESTAMP",
+        "protocol_fp": "TEXT",
+        "security_fp": "TEXT",
+        "transport_fp": "TEXT",
+        "source": "TEXT",
+    },
+    "source_stats": {
+        "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "url": "TEXT NOT NULL UNIQUE",
+        "fetches": "INTEGER DEFAULT 0",
+        "failures": "INTEGER DEFAULT 0",
+        "bytes": "INTEGER",
+        "seconds": "REAL",
+        "uris": "INTEGER",
+        "new_uris": "INTEGER",
+        "rejected": "INTEGER",
+        "new_per_mb": "REAL",
+        "new_per_second": "REAL",
+        "duplicate_ratio": "REAL",
+        "interval": "INTEGER",
+        "last_fetched_at": "DATETIME",
+        "next_due_at": "DATETIME",
+        "created_at": "DATETIME DEFAULT CURRENT_TIMESTAMP",
+        "updated_at": "DATETIME DEFAULT CURRENT_TIMESTAMP",
+    },
+    "pipeline_state": {
+        "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "name": "TEXT NOT NULL UNIQUE",
+        "cursor": "INTEGER DEFAULT 0",
+        "watermark": "DATETIME",
+        "started_at": "DATETIME",
+        "updated_at": "DATETIME DEFAULT CURRENT_TIMESTAMP",
+    },
+    "config_fingerprints": {
+        "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "fingerprint": "TEXT NOT NULL UNIQUE",
+        "section": "TEXT NOT NULL",
+        "name": "TEXT NOT NULL",
+        "created_at": "DATETIME DEFAULT CURRENT_TIMESTAMP",
     },
     "uris_rejected": {
         "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
         "line": "TEXT NOT NULL UNIQUE",
+        "scheme": "TEXT",
         "processed": "INTEGER DEFAULT 0",
         "created_at": "DATETIME DEFAULT CURRENT_TIMESTAMP",
         "updated_at": "DATETIME DEFAULT CURRENT_TIMESTAMP",
@@ -398,9 +563,77 @@ TABLE_SCHEMAS = {
         "hash": "TEXT NOT NULL UNIQUE",
         "remarks": "TEXT NOT NULL",
         "protocol": "TEXT NOT NULL",
+        "security": "TEXT",
+        "transport": "TEXT",
+        "address": "TEXT",
+        "port": "INTEGER",
         "proxy_object": "TEXT NOT NULL",
         "created_at": "DATETIME DEFAULT CURRENT_TIMESTAMP",
         "updated_at": "DATETIME DEFAULT CURRENT_TIMESTAMP",
+        "run_id": "INTEGER",
+        "country": "TEXT",
+        "asn": "INTEGER",
+        "geo_version": "TEXT",
+        "resolved_ip": "TEXT",
+        "collapsed": "INTEGER DEFAULT 0",
+    },
+    "dns_cache": {
+        "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "host": "TEXT NOT NULL UNIQUE",
+        "addresses": "TEXT",
+        "resolved_ip": "TEXT",
+        "error": "TEXT",
+        "expires_at": "DATETIME",
+        "created_at": "DATETIME DEFAULT CURRENT_TIMESTAMP",
+        "updated_at": "DATETIME DEFAULT CURRENT_TIMESTAMP",
+    },
+    "proxy_probes": {
+        "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "hash": "TEXT NOT NULL UNIQUE",
+        "address": "TEXT",
+        "port": "INTEGER",
+        "reachable": "INTEGER DEFAULT 0",
+        "connect_ms": "REAL",
+        "handshake_ms": "REAL",
+        "error": "TEXT",
+        "failures": "INTEGER DEFAULT 0",
+        "last_checked_at": "DATETIME",
+        "last_success_at": "DATETIME",
+        "created_at": "DATETIME DEFAULT CURRENT_TIMESTAMP",
+        "updated_at": "DATETIME DEFAULT CURRENT_TIMESTAMP",
+    },
+}
+
+TABLE_INDEXES = {
+    "uris_raw": {
+        "idx_uris_raw_processed_updated_at": ["processed", "updated_at"],
+        "idx_uris_raw_updated_at": ["updated_at"],
+        "idx_uris_raw_protocol_fp": ["protocol_fp", "processed"],
+        "idx_uris_raw_security_fp": ["security_fp", "processed"],
+        "idx_uris_raw_transport_fp": ["transport_fp", "processed"],
+    },
+    "uris_rejected": {
+        "idx_uris_rejected_updated_at": ["updated_at"],
+        "idx_uris_rejected_scheme": ["scheme", "processed"],
+    },
+    "uris_transformed": {
+        "idx_uris_transformed_filter": ["protocol", "security", "transport", "port"],
+        "idx_uris_transformed_address": ["address"],
+        "idx_uris_transformed_port": ["port"],
+        "idx_uris_transformed_run_id": ["run_id"],
+        "idx_uris_transformed_geo": ["country", "asn"],
+        "idx_uris_transformed_asn": ["asn"],
+        "idx_uris_transformed_resolved_ip": ["resolved_ip", "port"],
+    },
+    "dns_cache": {
+        "idx_dns_cache_expires_at": ["expires_at"],
+        "idx_dns_cache_resolved_ip": ["resolved_ip"],
+    },
+    "source_stats": {
+        "idx_source_stats_next_due_at": ["next_due_at"],
+    },
+    "proxy_probes": {
+        "idx_proxy_probes_reachable": ["reachable", "connect_ms"],
     },
 }
 
@@ -408,6 +641,21 @@ configs_map = {
     "LINKS": LINKS,
     "DB_PATH": DB_PATH,
     "URIS_TRANSFORM_PATH": URIS_TRANSFORM_PATH,
+    "WRITE_BEHIND": WRITE_BEHIND,
+    "SCHEDULE": SCHEDULE,
+    "FETCH": FETCH,
+    "RECLASSIFY": RECLASSIFY,
+    "SHARDS": SHARDS,
+    "PREFILTER": PREFILTER,
+    "TRANSFORM": TRANSFORM,
+    "DEDUP": DEDUP,
+    "XRAY_EXPORT": XRAY_EXPORT,
+    "PUBLISH": PUBLISH,
+    "PROBE": PROBE,
+    "RESOLVE": RESOLVE,
+    "GEOIP": GEOIP,
+    "RETENTION": RETENTION,
     "PROXIES": PROXIES,
     "TABLE_SCHEMAS": TABLE_SCHEMAS,
+    "TABLE_INDEXES": TABLE_INDEXES,
 }
@@ -1,9 +1,14 @@
+import os
+import queue
 import sqlite3
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
 
 
-def get_db_connection(db_path):
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+def get_db_connection(db_path, row_factory=sqlite3.Row):
+    conn = sqlite3.connect(db_path, uri=db_path.startswith("file:"))
+    conn.row_factory = row_factory
     return conn
 
 
@@ -12,6 +17,20 @@ def ensure_table(db_path, table_name, columns):
     sql = f"CREATE TABLE IF NOT EXISTS {table_name} ({', '.join(column_defs)})"
     with get_db_connection(db_path) as conn:
         conn.execute(sql)
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")}
+        for name, data_type in columns.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {name} {data_type}")
+        conn.commit()
+
+
+def ensure_indexes(db_path, table_name, indexes):
+    with get_db_connection(db_path) as conn:
+        for index_name, columns in indexes.items():
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {index_name} "
+                f"ON {table_name} ({', '.join(columns)})"
+            )
         conn.commit()
 
 
@@ -32,24 +51,16 @@ def select_all(db_path, table_name, where_clause="", params=()):
         return [dict(row) for row in rows]
 
 
-def bulk_upsert(db_path, table_name, records, key_columns, batch_size=10_000):
-    if not records:
-        return 0
-    iterator = records() if callable(records) else iter(records)
-    try:
-        first = next(iterator)
-    except StopIteration:
-        return 0
-    if not isinstance(first, dict):
-        raise TypeError("Records must be dictionaries mapping column names to values.")
-    all_columns = list(first.keys())
+def build_upsert_sql(table_name, columns, key_columns, touch_columns=()):
     if isinstance(key_columns, str):
         key_columns = [key_columns]
-    update_columns = [col for col in all_columns if col not in key_columns]
-    placeholders = ", ".join(["?"] * len(all_columns))
-    column_list = ", ".join(all_columns)
-    if update_columns:
-        update_set = ", ".join([f"{col} = excluded.{col}" for col in update_columns])
+    update_columns = [col for col in columns if col not in key_columns]
+    placeholders = ", ".join(["?"] * len(columns))
+    column_list = ", ".join(columns)
+    assignments = [f"{col} = excluded.{col}" for col in update_columns]
+    assignments += [f"{col} = CURRENT_TIMESTAMP" for col in touch_columns]
+    if assignments:
+        update_set = ", ".join(assignments)
         on_conflict_clause = (
             f"ON CONFLICT({', '.join(key_columns)}) DO UPDATE SET {update_set}"
         )
@@ -60,6 +71,118 @@ def bulk_upsert(db_path, table_name, records, key_columns, batch_size=10_000):
         VALUES ({placeholders})
         {on_conflict_clause}
     """.strip()
+    return sql
+
+
+def select_existing(conn, table_name, column, values, chunk_size=500):
+    values = list(values)
+    found = set()
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start : start + chunk_size]
+        placeholders = ", ".join(["?"] * len(chunk))
+        rows = conn.execute(
+            f"SELECT {column} FROM {table_name} WHERE {column} IN ({placeholders})",
+            chunk,
+        )
+        found.update(row[0] for row in rows)
+    return found
+
+
+def build_select_sql(table_name, columns=None, where_clause=""):
+    sql = f"SELECT {', '.join(columns) if columns else '*'} FROM {table_name}"
+    if where_clause:
+        sql += f" WHERE {where_clause}"
+    return sql
+
+
+def make_row_factory(row_type):
+    if row_type == "tuple":
+        return None
+    if row_type == "row":
+        return sqlite3.Row
+    if row_type == "namedtuple":
+        row_classes = {}
+
+        def namedtuple_factory(cursor, row):
+            fields = tuple(d[0] for d in cursor.description)
+            row_class = row_classes.get(fields)
+            if row_class is None:
+                row_class = namedtuple("Row", fields)
+                row_classes[fields] = row_class
+            return row_class._make(row)
+
+        return namedtuple_factory
+    raise ValueError(f"Unknown row type: {row_type}")
+
+
+def select_iter(
+    db_path,
+    table_name,
+    columns=None,
+    where_clause="",
+    params=(),
+    order_by="",
+    batch_size=1000,
+    row_type="tuple",
+):
+    sql = build_select_sql(table_name, columns, where_clause)
+    if order_by:
+        sql += f" ORDER BY {order_by}"
+    conn = get_db_connection(db_path, row_factory=make_row_factory(row_type))
+    try:
+        cur = conn.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+
+def select_pages(
+    db_path,
+    table_name,
+    columns=None,
+    where_clause="",
+    params=(),
+    page_size=1000,
+    after_rowid=0,
+    row_type="tuple",
+):
+    columns = ["rowid AS rowid"] + list(columns or [f"{table_name}.*"])
+    condition = "rowid > ?"
+    if where_clause:
+        condition = f"({where_clause}) AND {condition}"
+    sql = build_select_sql(table_name, columns, condition)
+    sql += " ORDER BY rowid LIMIT ?"
+    row_factory = make_row_factory(row_type)
+    last_rowid = after_rowid
+    while True:
+        with get_db_connection(db_path, row_factory=row_factory) as conn:
+            rows = conn.execute(sql, (*params, last_rowid, page_size)).fetchall()
+        if not rows:
+            break
+        yield rows
+        last_rowid = rows[-1][0]
+        if len(rows) < page_size:
+            break
+
+
+def bulk_upsert(
+    db_path, table_name, records, key_columns, batch_size=10_000, touch_columns=()
+):
+    if not records:
+        return 0
+    iterator = records() if callable(records) else iter(records)
+    try:
+        first = next(iterator)
+    except StopIteration:
+        return 0
+    if not isinstance(first, dict):
+        raise TypeError("Records must be dictionaries mapping column names to values.")
+    all_columns = list(first.keys())
+    sql = build_upsert_sql(table_name, all_columns, key_columns, touch_columns)
     batch = [tuple(first.values())]
     upserted = 0
     with get_db_connection(db_path) as conn:
@@ -77,8 +200,137 @@ def bulk_upsert(db_path, table_name, records, key_columns, batch_size=10_000):
     return upserted
 
 
+def run_call(conn, func, future):
+    try:
+        future.set_result(func(conn))
+    except Exception as e:
+        future.set_exception(e)
+
+
+class WriteBehindWriter:
+    def __init__(self, db_path, max_pending=8, group_size=4):
+        self.db_path = db_path
+        self.group_size = max(1, group_size)
+        self.pending = queue.Queue(maxsize=max(1, max_pending))
+        self.counts = {}
+        self.error = None
+        self.thread = threading.Thread(
+            target=self._run, name="write-behind", daemon=True
+        )
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def submit(self, tag, sql, rows):
+        if self.error is not None:
+            raise self.error
+        if not rows:
+            return
+        self.pending.put((tag, sql, rows))
+
+    def submit_call(self, tag, func):
+        if self.error is not None:
+            raise self.error
+        self.pending.put((tag, func, None))
+
+    def call(self, func):
+        if self.error is not None:
+            raise self.error
+        future = Future()
+        self.pending.put((None, None, (func, future)))
+        return future.result()
+
+    def close(self):
+        if self.thread.is_alive():
+            self.pending.put(None)
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.counts
+
+    def _run(self):
+        conn = get_db_connection(self.db_path)
+        stopping = False
+        try:
+            while not stopping:
+                group = [self.pending.get()]
+                while len(group) < self.group_size and group[-1] is not None:
+                    try:
+                        group.append(self.pending.get_nowait())
+                    except queue.Empty:
+                        break
+                if group[-1] is None:
+                    group.pop()
+                    stopping = True
+                if self.error is not None:
+                    self._fail_calls(group)
+                elif group:
+                    self._write_group(conn, group)
+        finally:
+            conn.close()
+
+    def _write_group(self, conn, group):
+        try:
+            with conn:
+                cur = conn.cursor()
+                for tag, sql, rows in group:
+                    if sql is None:
+                        run_call(conn, *rows)
+                        continue
+                    if callable(sql):
+                        self.counts[tag] = self.counts.get(tag, 0) + (sql(conn) or 0)
+                        continue
+                    cur.executemany(sql, rows)
+                    self.counts[tag] = self.counts.get(tag, 0) + cur.rowcount
+        except Exception as e:
+            self.error = e
+            self._fail_calls(group)
+
+    def _fail_calls(self, group):
+        for _, sql, rows in group:
+            if sql is None and not rows[1].done():
+                rows[1].set_exception(self.error)
+
+
+def load_into_memory(disk_path, memory_uri):
+    memory_conn = sqlite3.connect(memory_uri, uri=True, check_same_thread=False)
+    if os.path.exists(disk_path):
+        disk_conn = sqlite3.connect(disk_path)
+        try:
+            disk_conn.backup(memory_conn)
+        finally:
+            disk_conn.close()
+    return memory_conn
+
+
+def snapshot_to_disk(memory_conn, disk_path):
+    directory = os.path.dirname(disk_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = disk_path + ".tmp"
+    if os.path.exists(temp_path):
+        os.unlink(temp_path)
+    disk_conn = sqlite3.connect(temp_path)
+    try:
+        memory_conn.backup(disk_conn)
+    finally:
+        disk_conn.close()
+    with open(temp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(temp_path, disk_path)
+
+
 def optimize_database(db_path):
-    conn = sqlite3.connect(db_path)
+    conn = get_db_connection(db_path)
     conn.execute("PRAGMA journal_mode = DELETE")
     conn.execute("PRAGMA page_size = 4096")
     conn.execute("PRAGMA synchronous = NORMAL")
@@ -93,8 +345,16 @@ def optimize_database(db_path):
 database_map = {
     "get_db_connection": get_db_connection,
     "ensure_table": ensure_table,
+    "ensure_indexes": ensure_indexes,
     "count_records": count_records,
     "select_all": select_all,
+    "select_iter": select_iter,
+    "select_pages": select_pages,
+    "select_existing": select_existing,
+    "build_upsert_sql": build_upsert_sql,
     "bulk_upsert": bulk_upsert,
+    "write_behind_writer": WriteBehindWriter,
+    "load_into_memory": load_into_memory,
+    "snapshot_to_disk": snapshot_to_disk,
     "optimize_database": optimize_database,
 }
@@ -0,0 +1,415 @@
+import base64
+import binascii
+import json
+import re
+
+CLASH_KEYS = re.compile(
+    r"^(proxies|proxy-groups|proxy-providers|mixed-port|socks-port|port|allow-lan"
+    r"|mode|log-level|rules)\s*:",
+    re.MULTILINE,
+)
+BASE64_SAMPLE = re.compile(r"[A-Za-z0-9+/=_\-\s]+")
+YAML_KEY = re.compile(r"""^("[^"]*"|'[^']*'|[^\s:#][^:#]*?)\s*:(?:\s+(.*))?$""")
+YAML_COMMENT = re.compile(r"\s+#.*$")
+SINGBOX_SKIP = {"direct", "block", "dns", "selector", "urltest"}
+
+
+def sniff_format(content, sample_size=4096):
+    sample = content[:sample_size].lstrip("\ufeff \t\r\n")
+    if not sample:
+        return "uri_list"
+    if sample[0] in "{[":
+        return "singbox"
+    if CLASH_KEYS.search(sample):
+        return "clash"
+    if "://" in sample:
+        return "uri_list"
+    if BASE64_SAMPLE.fullmatch(sample):
+        return "base64"
+    return "uri_list"
+
+
+def decode_content(content, ctx):
+    sniff = ctx.decoders_map["sniff_format"]
+    content_format = sniff(content, ctx.configs_map["FETCH"]["sniff_bytes"])
+    ctx.metrics.incr(f"fetch.format.{content_format}")
+    return ctx.decoders_map[content_format](content, ctx)
+
+
+def decode_uri_list(content, ctx):
+    return content.splitlines()
+
+
+def decode_base64(content, ctx):
+    compact = "".join(content.split()).replace("-", "+").replace("_", "/")
+    try:
+        decoded = base64.b64decode(compact + "=" * (-len(compact) % 4))
+        text = decoded.decode("utf-8")
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        return content.splitlines()
+    sniff = ctx.decoders_map["sniff_format"]
+    content_format = sniff(text, ctx.configs_map["FETCH"]["sniff_bytes"])
+    if content_format == "base64":
+        return text.splitlines()
+    return ctx.decoders_map[content_format](text, ctx)
+
+
+def decode_clash(content, ctx):
+    to_uri = ctx.processors_map["proxy_to_uri"]
+    for proxy in clash_proxies(content):
+        uri = convert_entry(clash_to_proxy, proxy, to_uri)
+        if uri is None:
+            ctx.metrics.incr("fetch.entries_unsupported")
+            continue
+        yield uri
+
+
+def decode_singbox(content, ctx):
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        yield from content.splitlines()
+        return
+    outbounds = data.get("outbounds", []) if isinstance(data, dict) else data
+    to_uri = ctx.processors_map["proxy_to_uri"]
+    for outbound in outbounds if isinstance(outbounds, list) else []:
+        if not isinstance(outbound, dict) or outbound.get("type") in SINGBOX_SKIP:
+            continue
+        uri = convert_entry(singbox_to_proxy, outbound, to_uri)
+        if uri is None:
+            ctx.metrics.incr("fetch.entries_unsupported")
+            continue
+        yield uri
+
+
+def convert_entry(converter, entry, to_uri):
+    if not isinstance(entry, dict):
+        return None
+    try:
+        proxy_object = converter(entry)
+        return None if proxy_object is None else to_uri(proxy_object)
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+def clash_proxies(content):
+    lines = []
+    inside = False
+    for raw_line in content.splitlines():
+        text = raw_line.rstrip()
+        stripped = text.lstrip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        indent = len(text) - len(stripped)
+        if indent == 0 and not stripped.startswith("-"):
+            if inside:
+                break
+            key, _, rest = stripped.partition(":")
+            inside = key.strip() == "proxies"
+            if inside and rest.strip():
+                return parse_scalar(rest.strip()) or []
+            continue
+        if inside:
+            lines.append((indent, stripped))
+    if not lines:
+        return []
+    value, _ = parse_block(lines, 0, lines[0][0])
+    return value if isinstance(value, list) else []
+
+
+def parse_block(lines, position, indent):
+    if lines[position][1].startswith("-"):
+        return parse_sequence(lines, position, indent)
+    return parse_mapping(lines, position, indent)
+
+
+def parse_sequence(lines, position, indent):
+    items = []
+    while position < len(lines):
+        line_indent, text = lines[position]
+        if line_indent != indent or not text.startswith("-"):
+            break
+        rest = text[1:].lstrip()
+        if not rest:
+            position += 1
+            if position < len(lines) and lines[position][0] > indent:
+                value, position = parse_block(lines, position, lines[position][0])
+            else:
+                value = None
+        elif rest[0] not in "{[\"'" and YAML_KEY.match(rest):
+            rest_indent = indent + len(text) - len(rest)
+            lines[position] = (rest_indent, rest)
+            value, position = parse_mapping(lines, position, rest_indent)
+        else:
+            value = parse_scalar(rest)
+            position += 1
+        items.append(value)
+    return items, position
+
+
+def parse_mapping(lines, position, indent):
+    mapping = {}
+    while position < len(lines):
+        line_indent, text = lines[position]
+        if line_indent != indent or text.startswith("-"):
+            break
+        match = YAML_KEY.match(text)
+        if not match:
+            position += 1
+            continue
+        key = match.group(1).strip("\"'")
+        rest = match.group(2)
+        position += 1
+        if rest and not rest.startswith("#"):
+            mapping[key] = parse_scalar(rest)
+            continue
+        mapping[key] = None
+        if position < len(lines):
+            next_indent, next_text = lines[position]
+            if next_indent > indent or (
+                next_indent == indent and next_text.startswith("-")
+            ):
+                mapping[key], position = parse_block(lines, position, next_indent)
+    return mapping, position
+
+
+def parse_scalar(text):
+    text = text.strip()
+    if text[:1] in "{[":
+        try:
+            value, _ = parse_flow(text, 0)
+            return value
+        except (IndexError, ValueError):
+            return text
+    if text[:1] == '"':
+        end = text.rfind('"')
+        try:
+            return json.loads(text[: end + 1])
+        except json.JSONDecodeError:
+            return text[1:end]
+    if text[:1] == "'":
+        return text[1 : text.rfind("'")].replace("''", "'")
+    text = YAML_COMMENT.sub("", text)
+    lowered = text.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if lowered in ("null", "~"):
+        return None
+    if re.fullmatch(r"-?\d+", text):
+        return int(text)
+    return text
+
+
+def parse_flow(text, position):
+    while text[position] == " ":
+        position += 1
+    opener = text[position]
+    if opener not in "{[":
+        end = position
+        quote = text[position] if text[position] in "\"'" else None
+        if quote:
+            end = text.index(quote, position + 1) + 1
+        else:
+            while end < len(text) and text[end] not in ",]}":
+                end += 1
+        return parse_scalar(text[position:end]), end
+    closer = "}" if opener == "{" else "]"
+    collection = {} if opener == "{" else []
+    position += 1
+    while True:
+        while text[position] in " ,":
+            position += 1
+        if text[position] == closer:
+            return collection, position + 1
+        if opener == "[":
+            value, position = parse_flow(text, position)
+            collection.append(value)
+            continue
+        colon = text.index(":", position)
+        key = text[position:colon].strip().strip("\"'")
+        value, position = parse_flow(text, colon + 1)
+        collection[key] = value
+
+
+def clash_to_proxy(proxy):
+    kind = proxy.get("type")
+    try:
+        protocol = {
+            "type": kind,
+            "address": str(proxy["server"] or "").strip(),
+            "port": int(proxy["port"]),
+        }
+        if not protocol["address"]:
+            return None
+        if kind == "ss":
+            if proxy.get("plugin"):
+                return None
+            protocol.update(method=proxy["cipher"], password=str(proxy["password"]))
+            return {"protocol": protocol, "remarks": str(proxy.get("name", ""))}
+        if kind == "hysteria2":
+            protocol.update(
+                password=str(proxy["password"]),
+                sni=proxy.get("sni"),
+                obfs=proxy.get("obfs"),
+                insecure="1" if proxy.get("skip-cert-verify") else None,
+            )
+            protocol["obfs-password"] = proxy.get("obfs-password")
+            return {"protocol": protocol, "remarks": str(proxy.get("name", ""))}
+        if kind == "vmess":
+            protocol.update(id=proxy["uuid"], encryption=proxy.get("cipher", "auto"))
+        elif kind == "vless":
+            protocol.update(id=proxy["uuid"], encryption="none", flow=proxy.get("flow"))
+        elif kind == "trojan":
+            protocol.update(password=str(proxy["password"]))
+        else:
+            return None
+    except (KeyError, TypeError, ValueError):
+        return None
+    transport = clash_transport(proxy)
+    if transport is None:
+        return None
+    return {
+        "protocol": protocol,
+        "security": clash_security(proxy),
+        "transport": transport,
+        "remarks": str(proxy.get("name", "")),
+    }
+
+
+def clash_security(proxy):
+    sni = proxy.get("servername") or proxy.get("sni")
+    fingerprint = proxy.get("client-fingerprint")
+    reality = proxy.get("reality-opts")
+    if isinstance(reality, dict):
+        return {
+            "type": "reality",
+            "sni": sni,
+            "fp": fingerprint,
+            "pbk": reality.get("public-key"),
+            "sid": reality.get("short-id"),
+        }
+    if proxy.get("tls") or proxy.get("type") == "trojan":
+        return {"type": "tls", "sni": sni, "fp": fingerprint, "alpn": proxy.get("alpn")}
+    return {"type": "none"}
+
+
+def clash_transport(proxy):
+    network = proxy.get("network") or "tcp"
+    if network == "tcp":
+        return {"type": "raw"}
+    if network == "ws":
+        options = proxy.get("ws-opts") or {}
+        headers = options.get("headers") or {}
+        return {"type": "ws", "path": options.get("path"), "host": headers.get("Host")}
+    if network == "grpc":
+        options = proxy.get("grpc-opts") or {}
+        return {"type": "grpc", "serviceName": options.get("grpc-service-name")}
+    if network == "http":
+        options = proxy.get("http-opts") or {}
+        host = (options.get("headers") or {}).get("Host")
+        return {
+            "type": "raw",
+            "headerType": "http",
+            "path": options.get("path"),
+            "host": host[0] if isinstance(host, list) and host else host,
+        }
+    return None
+
+
+def singbox_to_proxy(outbound):
+    kind = outbound.get("type")
+    try:
+        protocol = {
+            "type": "ss" if kind == "shadowsocks" else kind,
+            "address": str(outbound["server"] or "").strip(),
+            "port": int(outbound["server_port"]),
+        }
+        if not protocol["address"]:
+            return None
+        tls = outbound.get("tls") or {}
+        if kind == "shadowsocks":
+            if outbound.get("plugin"):
+                return None
+            protocol.update(method=outbound["method"], password=outbound["password"])
+            return {"protocol": protocol, "remarks": outbound.get("tag", "")}
+        if kind == "hysteria2":
+            obfs = outbound.get("obfs") or {}
+            protocol.update(
+                password=outbound["password"],
+                sni=tls.get("server_name"),
+                obfs=obfs.get("type"),
+                insecure="1" if tls.get("insecure") else None,
+            )
+            protocol["obfs-password"] = obfs.get("password")
+            return {"protocol": protocol, "remarks": outbound.get("tag", "")}
+        if kind == "vmess":
+            protocol.update(
+                id=outbound["uuid"], encryption=outbound.get("security", "auto")
+            )
+        elif kind == "vless":
+            protocol.update(
+                id=outbound["uuid"], encryption="none", flow=outbound.get("flow")
+            )
+        elif kind == "trojan":
+            protocol.update(password=outbound["password"])
+        else:
+            return None
+    except (KeyError, TypeError, ValueError):
+        return None
+    transport = singbox_transport(outbound)
+    if transport is None:
+        return None
+    return {
+        "protocol": protocol,
+        "security": singbox_security(tls),
+        "transport": transport,
+        "remarks": outbound.get("tag", ""),
+    }
+
+
+def singbox_security(tls):
+    if not tls.get("enabled"):
+        return {"type": "none"}
+    fingerprint = (tls.get("utls") or {}).get("fingerprint")
+    reality = tls.get("reality") or {}
+    if reality.get("enabled"):
+        return {
+            "type": "reality",
+            "sni": tls.get("server_name"),
+            "fp": fingerprint,
+            "pbk": reality.get("public_key"),
+            "sid": reality.get("short_id"),
+        }
+    return {
+        "type": "tls",
+        "sni": tls.get("server_name"),
+        "fp": fingerprint,
+        "alpn": tls.get("alpn"),
+    }
+
+
+def singbox_transport(outbound):
+    transport = outbound.get("transport") or {}
+    kind = transport.get("type")
+    if not kind:
+        return {"type": "raw"}
+    if kind in ("ws", "httpupgrade"):
+        headers = transport.get("headers") or {}
+        return {
+            "type": kind,
+            "path": transport.get("path"),
+            "host": transport.get("host") or headers.get("Host"),
+        }
+    if kind == "grpc":
+        return {"type": "grpc", "serviceName": transport.get("service_name")}
+    return None
+
+
+decoders_map = {
+    "sniff_format": sniff_format,
+    "decode_content": decode_content,
+    "uri_list": decode_uri_list,
+    "base64": decode_base64,
+    "clash": decode_clash,
+    "singbox": decode_singbox,
+}
@@ -0,0 +1,228 @@
+import json
+import os
+import socket
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+
+HEADER = struct.Struct(">4sIIIQQ")
+MAGIC = b"XGI1"
+MISSING = object()
+
+
+class GeoIndex:
+    def __init__(self, v4, v6, labels, version="", cache_size=100_000):
+        self.v4_starts, self.v4_ends, self.v4_labels = v4
+        self.v6_starts, self.v6_ends, self.v6_labels = v6
+        self.labels = labels
+        self.version = version
+        self.cache_size = cache_size
+        self.cache = {}
+
+    def lookup(self, address):
+        result = self.cache.get(address, MISSING)
+        if result is not MISSING:
+            return result
+        result = self.find(address)
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        self.cache[address] = result
+        return result
+
+    def find(self, address):
+        if not address:
+            return None
+        address = address.strip("[]")
+        try:
+            value = int.from_bytes(socket.inet_pton(socket.AF_INET, address), "big")
+            return self.search(self.v4_starts, self.v4_ends, self.v4_labels, value)
+        except OSError:
+            pass
+        try:
+            packed = socket.inet_pton(socket.AF_INET6, address)
+        except OSError:
+            return None
+        if packed[:12] == b"\0" * 10 + b"\xff\xff":
+            value = int.from_bytes(packed[12:], "big")
+            return self.search(self.v4_starts, self.v4_ends, self.v4_labels, value)
+        value = int.from_bytes(packed, "big")
+        return self.search(self.v6_starts, self.v6_ends, self.v6_labels, value)
+
+    def search(self, starts, ends, label_ids, value):
+        position = bisect_right(starts, value) - 1
+        if position < 0 or value > ends[position]:
+            return None
+        return self.labels[label_ids[position]]
+
+    def stats(self):
+        return {
+            "v4_ranges": len(self.v4_starts),
+            "v6_ranges": len(self.v6_starts),
+            "labels": len(self.labels),
+            "cached": len(self.cache),
+        }
+
+    @classmethod
+    def from_ranges(cls, ranges, version="", cache_size=100_000):
+        label_ids = {}
+        v4 = (array("I"), array("I"), array("I"))
+        v6 = ([], [], array("I"))
+        for family, start, end, label in sorted(ranges, key=lambda r: r[:3]):
+            label_id = label_ids.setdefault(label, len(label_ids))
+            starts, ends, labels = v4 if family == 4 else v6
+            if (
+                starts
+                and labels[-1] == label_id
+                and starts[-1] <= start <= ends[-1] + 1
+            ):
+                ends[-1] = max(ends[-1], end)
+                continue
+            starts.append(start)
+            ends.append(end)
+            labels.append(label_id)
+        return cls(v4, v6, list(label_ids), version, cache_size)
+
+    @classmethod
+    def from_csv(cls, path, cache_size=100_000):
+        return cls.from_ranges(
+            read_ranges(path), source_version(path), cache_size=cache_size
+        )
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        labels = json.dumps(self.labels, separators=(",", ":")).encode("utf-8")
+        v6_bounds = b"".join(
+            start.to_bytes(16, "big") + end.to_bytes(16, "big")
+            for start, end in zip(self.v6_starts, self.v6_ends)
+        )
+        version = self.version.encode("utf-8")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC,
+                    len(self.v4_starts),
+                    len(self.v6_starts),
+                    len(version),
+                    len(labels),
+                    len(v6_bounds),
+                )
+            )
+            f.write(version)
+            f.write(labels)
+            for values in (self.v4_starts, self.v4_ends, self.v4_labels):
+                f.write(little_endian(values).tobytes())
+            f.write(little_endian(self.v6_labels).tobytes())
+            f.write(v6_bounds)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, cache_size=100_000):
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            return None
+        magic, v4_count, v6_count, version_length, labels_length, bounds_length = (
+            HEADER.unpack_from(data)
+        )
+        if magic != MAGIC:
+            return None
+        offset = HEADER.size
+        version = data[offset : offset + version_length].decode("utf-8")
+        offset += version_length
+        labels = [
+            tuple(label)
+            for label in json.loads(data[offset : offset + labels_length] or b"[]")
+        ]
+        offset += labels_length
+        v4 = []
+        for count in (v4_count, v4_count, v4_count, v6_count):
+            values = array("I")
+            values.frombytes(data[offset : offset + count * values.itemsize])
+            v4.append(little_endian(values))
+            offset += count * values.itemsize
+        v6_labels = v4.pop()
+        bounds = data[offset : offset + bounds_length]
+        v6_starts = [
+            int.from_bytes(bounds[i : i + 16], "big") for i in range(0, len(bounds), 32)
+        ]
+        v6_ends = [
+            int.from_bytes(bounds[i + 16 : i + 32], "big")
+            for i in range(0, len(bounds), 32)
+        ]
+        return cls(
+            tuple(v4), (v6_starts, v6_ends, v6_labels), labels, version, cache_size
+        )
+
+
+def little_endian(values):
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+def source_version(path):
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def parse_ip(value):
+    value = value.strip().strip('"')
+    if value.isdigit():
+        number = int(value)
+        return (4 if number < 1 << 32 else 6), number
+    for family, version in ((socket.AF_INET, 4), (socket.AF_INET6, 6)):
+        try:
+            return version, int.from_bytes(socket.inet_pton(family, value), "big")
+        except OSError:
+            continue
+    return None, None
+
+
+def parse_asn(value):
+    value = value.strip().strip('"').upper().removeprefix("AS")
+    return int(value) if value.isdigit() and int(value) else None
+
+
+def read_ranges(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\r\n").split("\t" if "\t" in line else ",")
+            if len(fields) < 4:
+                continue
+            family, start = parse_ip(fields[0])
+            end_family, end = parse_ip(fields[1])
+            if family is None or family != end_family or start > end:
+                continue
+            asn = parse_asn(fields[2])
+            country = fields[3].strip().strip('"').upper()
+            if country in ("", "NONE", "-", "ZZ"):
+                country = None
+            if country is None and asn is None:
+                continue
+            yield family, start, end, (country, asn)
+
+
+def load_geo_index(source_path, cache_path, cache_size=100_000):
+    if not os.path.exists(source_path):
+        if cache_path and os.path.exists(cache_path):
+            return GeoIndex.load(cache_path, cache_size)
+        return None
+    if cache_path and os.path.exists(cache_path):
+        index = GeoIndex.load(cache_path, cache_size)
+        if index is not None and index.version == source_version(source_path):
+            return index
+    index = GeoIndex.from_csv(source_path, cache_size)
+    if cache_path:
+        index.save(cache_path)
+    return index
@@ -0,0 +1,117 @@
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+
+class Metrics:
+    def __init__(self, profile_dir=None, sample_size=5):
+        self.profile_dir = profile_dir
+        self.sample_size = sample_size
+        self.started_at = time.time()
+        self.counters = {}
+        self.spans = {}
+        self.stages = {}
+        self.rejection_reason = None
+        self.rejection_samples = {}
+
+    def incr(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def note_rejection(self, reason):
+        self.rejection_reason = reason
+
+    def reject(self, protocol, stage, uri, reason=None):
+        reason = reason or self.rejection_reason or "unknown"
+        self.rejection_reason = None
+        key = f"rejected.{protocol}.{stage}.{reason}"
+        self.counters[key] = self.counters.get(key, 0) + 1
+        samples = self.rejection_samples.setdefault(key, [])
+        if len(samples) < self.sample_size:
+            samples.append(uri)
+
+    def rejections(self):
+        return sorted(
+            (
+                (count, name.split(".", 3)[1:])
+                for name, count in self.counters.items()
+                if name.startswith("rejected.")
+            ),
+            reverse=True,
+        )
+
+    @contextlib.contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_span(self.spans, name, time.perf_counter() - started)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        profiler = None
+        if self.profile_dir:
+            tracemalloc.start()
+            profiler = cProfile.Profile()
+            profiler.enable()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            entry = self.record_span(self.stages, name, elapsed)
+            if profiler is not None:
+                profiler.disable()
+                entry["peak_memory_bytes"] = max(
+                    entry.get("peak_memory_bytes", 0),
+                    tracemalloc.get_traced_memory()[1],
+                )
+                tracemalloc.stop()
+                entry["profile_path"] = self.dump_profile(name, profiler)
+
+    def record_span(self, table, name, elapsed):
+        entry = table.setdefault(name, {"calls": 0, "seconds": 0.0})
+        entry["calls"] += 1
+        entry["seconds"] += elapsed
+        return entry
+
+    def dump_profile(self, name, profiler):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"{name}.prof")
+        profiler.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(15)
+        with open(os.path.join(self.profile_dir, f"{name}.txt"), "w") as f:
+            f.write(summary.getvalue())
+        return path
+
+    def report(self):
+        return {
+            "started_at": time.strftime(
+                "%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started_at)
+            ),
+            "duration_seconds": time.time() - self.started_at,
+            "stages": self.stages,
+            "spans": self.spans,
+            "counters": dict(sorted(self.counters.items())),
+            "rejection_samples": dict(sorted(self.rejection_samples.items())),
+        }
+
+    def write_json(self, path, **extra):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**extra, **self.report()}, f, indent=2)
+
+    def print_summary(self):
+        for name, entry in self.stages.items():
+            line = f"   {name:<10} {entry['seconds']:>8.2f}s"
+            if "peak_memory_bytes" in entry:
+                line += f"  peak {entry['peak_memory_bytes'] / 1_048_576:.1f} MiB"
+            print(line)
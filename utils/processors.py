@@ -1,8 +1,9 @@
 import base64
+import hashlib
 import json
 import re
 import uuid
-from urllib.parse import unquote, unquote_plus
+from urllib.parse import quote, unquote, unquote_plus
 from utils.validators import validators_map
 
 
@@ -120,6 +121,197 @@ def write_json_file(objects, file_path):
     print(f"Saved JSON with {len(objects)} processed URIs to {file_path}.")
 
 
+def line_scheme(line):
+    scheme, separator, _ = line.partition("://")
+    if not separator or not re.fullmatch(r"[A-Za-z][A-Za-z0-9+.\-]*", scheme):
+        return ""
+    return scheme.lower()
+
+
+def shard_of(key, count):
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def proxy_to_record(proxy_object):
+    protocol = proxy_object.get("protocol", {})
+    return {
+        "hash": proxy_object["hash"],
+        "remarks": proxy_object.get("remarks", ""),
+        "protocol": protocol.get("type"),
+        "security": proxy_object.get("security", {}).get("type"),
+        "transport": proxy_object.get("transport", {}).get("type"),
+        "address": protocol.get("address"),
+        "port": protocol.get("port"),
+        "proxy_object": json.dumps(proxy_object, ensure_ascii=False, sort_keys=True),
+    }
+
+
+def proxy_to_outbound(proxy_object, tag):
+    protocol = proxy_object["protocol"]
+    protocol_type = protocol["type"]
+    server = {"address": protocol["address"], "port": protocol["port"]}
+    if protocol_type == "vless":
+        user = {"id": protocol["id"], "encryption": protocol.get("encryption", "none")}
+        if protocol.get("flow"):
+            user["flow"] = protocol["flow"]
+        settings = {"vnext": [{**server, "users": [user]}]}
+    elif protocol_type == "vmess":
+        user = {"id": protocol["id"], "security": protocol.get("encryption", "auto")}
+        settings = {"vnext": [{**server, "users": [user]}]}
+    elif protocol_type == "trojan":
+        settings = {"servers": [{**server, "password": protocol["password"]}]}
+    elif protocol_type == "ss":
+        settings = {
+            "servers": [
+                {
+                    **server,
+                    "method": protocol["method"],
+                    "password": protocol["password"],
+                }
+            ]
+        }
+    else:
+        return None
+    return {
+        "tag": tag,
+        "protocol": "shadowsocks" if protocol_type == "ss" else protocol_type,
+        "settings": settings,
+        "streamSettings": stream_settings(
+            proxy_object.get("security", {}), proxy_object.get("transport", {})
+        ),
+    }
+
+
+def stream_settings(security, transport):
+    network = transport.get("type", "raw")
+    security_type = security.get("type", "none")
+    settings = {"network": network, "security": security_type}
+    if security_type == "tls":
+        settings["tlsSettings"] = drop_empty(
+            {
+                "serverName": security.get("sni"),
+                "fingerprint": security.get("fp"),
+                "alpn": security.get("alpn"),
+            }
+        )
+    elif security_type == "reality":
+        settings["realitySettings"] = drop_empty(
+            {
+                "serverName": security.get("sni"),
+                "fingerprint": security.get("fp"),
+                "publicKey": security.get("pbk"),
+                "shortId": security.get("sid"),
+                "spiderX": security.get("spx"),
+            }
+        )
+    if network in ("ws", "httpupgrade"):
+        transport_settings = {
+            "path": transport.get("path"),
+            "host": transport.get("host"),
+        }
+    elif network == "xhttp":
+        transport_settings = {
+            "path": transport.get("path"),
+            "host": transport.get("host"),
+            "mode": transport.get("mode"),
+            "extra": transport.get("extra"),
+        }
+    elif network == "grpc":
+        transport_settings = {
+            "serviceName": transport.get("serviceName"),
+            "authority": transport.get("authority"),
+            "multiMode": transport.get("mode") == "multi",
+        }
+    elif transport.get("headerType") == "http":
+        request = {"path": transport.get("path", ["/"])}
+        if transport.get("host"):
+            request["headers"] = {"Host": transport["host"]}
+        transport_settings = {"header": {"type": "http", "request": request}}
+    else:
+        transport_settings = {"header": {"type": "none"}}
+    settings[f"{network}Settings"] = drop_empty(transport_settings)
+    return settings
+
+
+def proxy_to_uri(proxy_object):
+    protocol = dict(proxy_object["protocol"])
+    protocol_type = protocol.pop("type")
+    address = protocol.pop("address")
+    port = protocol.pop("port")
+    host = f"[{address}]" if ":" in address else address
+    remarks = quote(proxy_object.get("remarks", ""), safe="")
+    security_type = proxy_object.get("security", {}).get("type")
+    if protocol_type == "vmess" and security_type in ("tls", "none"):
+        return vmess_share_link(proxy_object)
+    if protocol_type == "ss":
+        userinfo = f"{protocol['method']}:{protocol['password']}"
+        encoded = base64.b64encode(userinfo.encode("utf-8")).decode("ascii")
+        return f"ss://{encoded}@{host}:{port}#{remarks}"
+    credential = protocol.pop("id", None) or protocol.pop("password")
+    params = dict(protocol)
+    security = dict(proxy_object.get("security", {}))
+    if security:
+        params["security"] = security.pop("type")
+        params.update(security)
+    transport = dict(proxy_object.get("transport", {}))
+    if transport:
+        transport_type = transport.pop("type")
+        params["type"] = "tcp" if transport_type == "raw" else transport_type
+        params.update(transport)
+    query = "&".join(
+        f"{key}={quote(share_value(value), safe='')}"
+        for key, value in sorted(params.items())
+        if value not in (None, "", [], {})
+    )
+    return f"{protocol_type}://{quote(credential, safe='')}@{host}:{port}?{query}#{remarks}"
+
+
+def vmess_share_link(proxy_object):
+    protocol = proxy_object["protocol"]
+    security = proxy_object.get("security", {})
+    transport = proxy_object.get("transport", {})
+    network = transport.get("type", "raw")
+    blob = {
+        "v": "2",
+        "ps": proxy_object.get("remarks", ""),
+        "add": protocol["address"],
+        "port": str(protocol["port"]),
+        "id": protocol["id"],
+        "aid": "0",
+        "scy": protocol.get("encryption", "auto"),
+        "net": "tcp" if network == "raw" else network,
+        "type": transport.get("headerType", "none"),
+        "host": share_value(transport.get("host", "")),
+        "path": share_value(transport.get("path", "")),
+        "tls": "tls" if security.get("type") == "tls" else "",
+        "sni": security.get("sni", ""),
+        "alpn": share_value(security.get("alpn", "")),
+        "fp": security.get("fp", ""),
+    }
+    if network == "grpc":
+        blob["path"] = transport.get("serviceName", "")
+        blob["serviceName"] = transport.get("serviceName", "")
+        blob["mode"] = transport.get("mode", "gun")
+        blob["authority"] = transport.get("authority", "")
+    encoded = json.dumps(blob, ensure_ascii=False, sort_keys=True)
+    return "vmess://" + base64.b64encode(encoded.encode("utf-8")).decode("ascii")
+
+
+def share_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ",".join(str(v) for v in value)
+    if isinstance(value, dict):
+        return json.dumps(value, separators=(",", ":"), sort_keys=True)
+    return str(value)
+
+
+def drop_empty(values):
+    return {k: v for k, v in values.items() if v not in (None, "", [], {})}
+
+
 def parse_params(params_str):
     params = {}
     if params_str:
@@ -146,8 +338,10 @@ def parse_params(params_str):
     return params
 
 
-def extract_params(params, field_values):
+def extract_params(params, field_values, on_reject=None):
     if not isinstance(field_values, dict):
+        if on_reject:
+            on_reject("no_schema")
         return None
     result = {}
     for field_key, field_value in field_values.items():
@@ -165,6 +359,8 @@ def extract_params(params, field_values):
             if default is not None:
                 result[field_key] = default
             elif required:
+                if on_reject:
+                    on_reject(f"missing:{field_key}")
                 return None
             continue
         else:
@@ -175,9 +371,13 @@ def extract_params(params, field_values):
                 validator_func = validators_map.get(validator_name)
                 if validator_func:
                     if not validator_func(raw_value):
+                        if on_reject:
+                            on_reject(f"invalid:{field_key}:{validator_name}")
                         return None
             result[field_key] = raw_value
     result = {k: v for k, v in result.items() if v != ""}
+    if not result and on_reject:
+        on_reject("empty")
     return result if result else None
 
 
@@ -213,6 +413,11 @@ processors_map = {
     "path_start_with_slash": path_start_with_slash,
     "uri_generator": uri_generator,
     "write_json_file": write_json_file,
+    "line_scheme": line_scheme,
+    "shard_of": shard_of,
+    "proxy_to_record": proxy_to_record,
+    "proxy_to_outbound": proxy_to_outbound,
+    "proxy_to_uri": proxy_to_uri,
     "parse_params": parse_params,
     "extract_params": extract_params,
     "extract_params_vmess": extract_params_vmess,
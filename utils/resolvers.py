@@ -0,0 +1,141 @@
+import asyncio
+import random
+import socket
+import struct
+
+DNS_HEADER = struct.Struct(">HHHHHH")
+DNS_ANSWER = struct.Struct(">HHIH")
+QUERY_TYPES = {socket.AF_INET: 1, socket.AF_INET6: 28}
+RCODES = {2: "servfail", 3: "nxdomain", 5: "refused"}
+
+
+class ResolveError(Exception):
+    pass
+
+
+def ip_literal(address):
+    address = (address or "").strip("[]")
+    for family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            return socket.inet_ntop(family, socket.inet_pton(family, address))
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+async def resolve_system(host, config):
+    loop = asyncio.get_running_loop()
+    try:
+        infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        code = "nxdomain" if e.errno == socket.EAI_NONAME else f"gai:{e.errno}"
+        raise ResolveError(code) from e
+    except UnicodeError as e:
+        raise ResolveError("badname") from e
+    return sorted({info[4][0] for info in infos}), None
+
+
+async def resolve_hosts(host, config):
+    addresses = config["hosts"].get(host.lower())
+    if not addresses:
+        raise ResolveError("nxdomain")
+    if isinstance(addresses, str):
+        addresses = [addresses]
+    return sorted(addresses), None
+
+
+async def resolve_udp(host, config):
+    server, _, port = config["nameserver"].rpartition(":")
+    addresses = []
+    ttls = []
+    for family, query_type in QUERY_TYPES.items():
+        answers = await query_udp(host, query_type, (server, int(port)), config)
+        for address, ttl in answers:
+            try:
+                addresses.append(socket.inet_ntop(family, address))
+            except ValueError as e:
+                raise ResolveError("malformed") from e
+            ttls.append(ttl)
+        if addresses:
+            break
+    if not addresses:
+        raise ResolveError("nodata")
+    return sorted(set(addresses)), min(ttls)
+
+
+async def query_udp(host, query_type, server, config):
+    loop = asyncio.get_running_loop()
+    query_id = random.getrandbits(16)
+    packet = DNS_HEADER.pack(query_id, 0x0100, 1, 0, 0, 0)
+    packet += encode_name(host) + struct.pack(">HH", query_type, 1)
+    response = loop.create_future()
+
+    class Protocol(asyncio.DatagramProtocol):
+        def datagram_received(self, data, addr):
+            if not response.done() and data[:2] == packet[:2]:
+                response.set_result(data)
+
+        def error_received(self, exc):
+            if not response.done():
+                response.set_exception(exc)
+
+    transport, _ = await loop.create_datagram_endpoint(Protocol, remote_addr=server)
+    try:
+        transport.sendto(packet)
+        data = await asyncio.wait_for(response, config["timeout"])
+    finally:
+        transport.close()
+    try:
+        return parse_response(data, query_type)
+    except (struct.error, IndexError) as e:
+        raise ResolveError("malformed") from e
+
+
+def encode_name(host):
+    encoded = b""
+    for label in host.rstrip(".").split("."):
+        try:
+            raw = label.encode("idna")
+        except UnicodeError as e:
+            raise ResolveError("badname") from e
+        if not raw or len(raw) > 63:
+            raise ResolveError("badname")
+        encoded += bytes([len(raw)]) + raw
+    return encoded + b"\0"
+
+
+def skip_name(data, offset):
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        offset += 1
+        if length == 0:
+            return offset
+        offset += length
+
+
+def parse_response(data, query_type):
+    _, flags, questions, answers, _, _ = DNS_HEADER.unpack_from(data)
+    rcode = flags & 0x0F
+    if rcode:
+        raise ResolveError(RCODES.get(rcode, f"rcode:{rcode}"))
+    offset = DNS_HEADER.size
+    for _ in range(questions):
+        offset = skip_name(data, offset) + 4
+    results = []
+    for _ in range(answers):
+        offset = skip_name(data, offset)
+        record_type, _, ttl, length = DNS_ANSWER.unpack_from(data, offset)
+        offset += DNS_ANSWER.size
+        if record_type == query_type:
+            results.append((data[offset : offset + length], ttl))
+        offset += length
+    return results
+
+
+resolvers_map = {
+    "system": resolve_system,
+    "hosts": resolve_hosts,
+    "udp": resolve_udp,
+}
@@ -1,45 +1,141 @@
+import ipaddress
 import re
 import uuid
 
+IPV4_SHAPE_PATTERN = re.compile(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$")
+IPV6_FULL_PATTERN = re.compile(r"^([0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}$")
+IPV6_SHAPE_PATTERN = re.compile(r"^[0-9a-fA-F:.]+$")
+DOMAIN_PATTERN = re.compile(
+    r"^[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*$"
+)
+HOST_LABEL_PATTERN = re.compile(r"^[a-z0-9]([a-z0-9\-]{0,61}[a-z0-9])?$")
+UUID_PATTERN = re.compile(
+    r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+)
+
+
+def check_ipv4(addr):
+    if not isinstance(addr, str):
+        return "not_string"
+    if not IPV4_SHAPE_PATTERN.match(addr):
+        return "ipv4_format"
+    if all(int(octet) <= 255 for octet in addr.split(".")):
+        return None
+    return "ipv4_octet"
+
+
+def check_ipv6(addr):
+    if not isinstance(addr, str):
+        return "not_string"
+    if IPV6_FULL_PATTERN.match(addr):
+        return None
+    if ":" not in addr or not IPV6_SHAPE_PATTERN.match(addr.split("%", 1)[0]):
+        return "ipv6_format"
+    try:
+        ipaddress.IPv6Address(addr)
+    except ValueError:
+        return "ipv6_format"
+    return None
+
+
+def check_domain(addr):
+    if not isinstance(addr, str):
+        return "not_string"
+    if not DOMAIN_PATTERN.match(addr):
+        return "domain_format"
+    return None
+
+
+def check_host(host):
+    for label in str(host).split("."):
+        if not label or label.isdigit() or "--" in label:
+            continue
+        if HOST_LABEL_PATTERN.match(label):
+            return None
+    return "host_label"
+
+
+def check_port(value):
+    if not isinstance(value, int) or isinstance(value, bool):
+        return "port_type"
+    if not 1 <= value <= 65535:
+        return "port_range"
+    return None
+
+
+def check_uuid(val):
+    if isinstance(val, str) and UUID_PATTERN.match(val):
+        return None
+    try:
+        uuid.UUID(str(val))
+        return None
+    except (ValueError, TypeError):
+        return "uuid_format"
+
 
 def validate_ipv4(addr):
-    return bool(re.match(r"^(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})$", addr)) and all(
-        0 <= int(o) <= 255 for o in addr.split(".")
-    )
+    return check_ipv4(addr) is None
 
 
 def validate_ipv6(addr):
-    return bool(re.match(r"^([0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}$", addr))
+    return check_ipv6(addr) is None
 
 
 def validate_domain(addr):
-    return bool(
-        re.match(
-            r"^[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*$",
-            addr,
-        )
-    )
+    return check_domain(addr) is None
 
 
 def validate_host(host):
-    return any(
-        re.match(r"^[a-z0-9]([a-z0-9\-]{0,61}[a-z0-9])?$", label) and len(label) <= 63
-        for label in str(host).split(".")
-        if label and not label.isdigit() and "--" not in label
-    )
+    return check_host(host) is None
 
 
 def validate_port(value: int) -> bool:
-    return isinstance(value, int) and 1 <= value <= 65535
+    return check_port(value) is None
 
 
 def validate_uuid(val):
-    try:
-        uuid.UUID(str(val))
-        return True
-    except (ValueError, TypeError):
-        return False
+    return check_uuid(val) is None
+
 
+def validate_batch(validator_names, values):
+    if isinstance(validator_names, str):
+        validator_names = [validator_names]
+    checks = [checks_map[name] for name in validator_names]
+    if len(checks) == 1:
+        reasons = list(map(checks[0], values))
+        return [reason is None for reason in reasons], reasons
+    results = {}
+    reasons = []
+    for value in values:
+        try:
+            reason = results[value]
+        except KeyError:
+            reason = any_of(checks, value)
+            results[value] = reason
+        except TypeError:
+            reason = any_of(checks, value)
+        reasons.append(reason)
+    return [reason is None for reason in reasons], reasons
+
+
+def any_of(checks, value):
+    failures = []
+    for check in checks:
+        reason = check(value)
+        if reason is None:
+            return None
+        failures.append(reason)
+    return ",".join(failures)
+
+
+checks_map = {
+    "ipv4": check_ipv4,
+    "ipv6": check_ipv6,
+    "domain": check_domain,
+    "port": check_port,
+    "uuid": check_uuid,
+    "host": check_host,
+}
 
 validators_map = {
     "ipv4": validate_ipv4,
@@ -49,3 +145,7 @@ validators_map = {
     "uuid": validate_uuid,
     "host": validate_host,
 }
+
+batch_map = {
+    "validate_batch": validate_batch,
+}